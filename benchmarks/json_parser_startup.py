@@ -0,0 +1,60 @@
+"""
+Compare the start-up cost of the JSON grammar parser.
+
+    python -m benchmarks.json_parser_startup [repetitions]
+
+"build" generates the LALR tables from ``_JSON_GRAMMAR`` as every import did
+before the tables were generated ahead of time, and "tables" loads them from
+``json_grammar_tables``. The last row imports ``utils.json.json_grammar`` in
+fresh interpreters.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+from lark import Lark
+
+from utils.json import json_grammar, json_grammar_tables
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import utils.json.json_grammar
+print(time.perf_counter() - start)
+"""
+
+
+def _report(label: str, timings) -> None:
+    print(f"{label:<14} median {statistics.median(timings) * 1e3:8.2f} ms   min {min(timings) * 1e3:8.2f} ms")
+
+
+def _measure(label: str, load, repetitions: int) -> None:
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - start)
+    _report(label, timings)
+
+
+def _measure_import(label: str, repetitions: int) -> None:
+    timings = []
+    for _ in range(repetitions):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+        timings.append(float(output.stdout))
+    _report(label, timings)
+
+
+def main(repetitions: int = 20) -> None:
+    transformer = json_grammar._JsonValueBuilder()
+
+    _measure("build", lambda: Lark(json_grammar._JSON_GRAMMAR, start="object", parser="lalr",
+                                   transformer=transformer), repetitions)
+    _measure("tables", lambda: Lark._load_from_dict(json_grammar_tables.DATA, json_grammar_tables.MEMO,
+                                                    transformer=transformer), repetitions)
+    _measure_import("import", min(repetitions, 10))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,71 @@
+"""
+Compare the start-up cost of the base64 Turing machine loaders.
+
+    python -m benchmarks.tm_startup [repetitions]
+
+"cold" expands the JSON config and writes the compiled artifact, "cached"
+reloads that artifact, "compile" expands the config without any artifact
+(what "cached" has to beat), and "dtm" builds the automata-lib DTM as the
+app did at import time before the machines were loaded lazily. The last two rows run
+in fresh interpreters: importing ``utils.base64`` no longer builds a machine,
+and the first encode pays for the cached load.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+from turing_machine.b64_encode import config_path
+from turing_machine.loader import load_compiled_tm, load_tm
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import utils.base64
+imported = time.perf_counter()
+utils.base64.encode_base64_url("hello")
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def _remove_artifacts() -> None:
+    for path in config_path.parent.glob(f"{config_path.stem}.v*.tmcache"):
+        path.unlink()
+
+
+def _measure(label: str, load, repetitions: int, before=None) -> None:
+    timings = []
+    for _ in range(repetitions):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - start)
+
+    print(f"{label:<8} median {statistics.median(timings) * 1e6:10.1f} us   "
+          f"min {min(timings) * 1e6:10.1f} us")
+
+
+def main(repetitions: int = 50) -> None:
+    path = str(config_path)
+
+    _measure("cold", lambda: load_compiled_tm(path), repetitions, before=_remove_artifacts)
+    _measure("cached", lambda: load_compiled_tm(path), repetitions)
+    _measure("compile", lambda: load_compiled_tm(path, use_artifact=False), repetitions)
+    _measure("dtm", lambda: load_tm(path), repetitions)
+
+    imports, first_encodes = [], []
+    for _ in range(min(repetitions, 10)):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+        import_time, encode_time = map(float, output.stdout.split())
+        imports.append(import_time)
+        first_encodes.append(encode_time)
+
+    print(f"{'import':<8} median {statistics.median(imports) * 1e6:10.1f} us   (utils.base64)")
+    print(f"{'encode':<8} median {statistics.median(first_encodes) * 1e6:10.1f} us   (first encode_base64_url call)")
+
+    print(f"artifacts: {', '.join(p.name for p in config_path.parent.glob('*.tmcache'))}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -2,12 +2,15 @@ from http import HTTPStatus
 
 from flask import Blueprint
 
-from schemas.req_body import AnalyzeTokenReqSchema
-from schemas.req_body import BuildTokenReqSchema
-from services.jwt_service import JwtService
+from schemas.req_body import AnalyzeTokenReqSchema, AnalyzeTokenBatchReqSchema, BuildTokenBatchReqSchema
+from exceptions.service_exception import ServiceException
+from schemas.req_body import BuildTokenReqSchema, SecretAuditReqSchema
+from services.jwt_service import JwtService, segment_cache, analysis_cache
+from services.secret_audit import audit_target, iter_secret_audit, resolve_wordlist
+from turing_machine import telemetry as tm_telemetry
 from type_defs.http_types import HttpResponse
 from type_defs.json_types import JsonObject
-from utils.response_factory import response
+from utils.response_factory import response, error_response, ndjson_response
 from validation.request_validation import validate_req_body
 
 jwt_bp = Blueprint("jwt", __name__)
@@ -19,9 +22,9 @@ jwt_service = JwtService()
 def build_jwt(req_body: JsonObject) -> HttpResponse:
     header = req_body["header"]
     payload = req_body["payload"]
-    secret_key = req_body["secret"]
+    secret_key = req_body.get("secret")
 
-    token_data = jwt_service.build_token(header, payload, secret_key)
+    token_data = jwt_service.build_token(header, payload, secret_key, include_telemetry=req_body["telemetry"])
 
     return response(
         data=dict(token_data),
@@ -30,12 +33,32 @@ def build_jwt(req_body: JsonObject) -> HttpResponse:
     )
 
 
+@jwt_bp.post("/build/batch")
+@validate_req_body(BuildTokenBatchReqSchema)
+def build_jwt_batch(req_body: JsonObject) -> HttpResponse:
+    results = jwt_service.build_token_batch(req_body["items"])
+
+    return response(
+        data=[dict(result) for result in results],
+        message="Tokens creados correctamente.",
+        status=HTTPStatus.OK
+    )
+
+
 @jwt_bp.post("/analyze")
 @validate_req_body(AnalyzeTokenReqSchema)
 def analyze_jwt(req_body):
     token = req_body["token"]
     secret = req_body.get("secret", None)
-    analysis_result = jwt_service.analyze_token(token, secret)
+
+    derivation_format = req_body["derivation_format"]
+    include = req_body["include"]
+
+    if req_body["stream"]:
+        stages = jwt_service.iter_token_analysis(token, secret, derivation_format=derivation_format, include=include)
+        return ndjson_response({"stage": stage, "data": data} for stage, data in stages)
+
+    analysis_result = jwt_service.analyze_token(token, secret, derivation_format=derivation_format, include=include)
 
     return response(
         data=dict(analysis_result),
@@ -44,6 +67,51 @@ def analyze_jwt(req_body):
     )
 
 
+@jwt_bp.post("/analyze/batch")
+@validate_req_body(AnalyzeTokenBatchReqSchema)
+def analyze_jwt_batch(req_body: JsonObject) -> HttpResponse:
+    if req_body["stream"]:
+        return ndjson_response(jwt_service.iter_token_batch_stages(req_body["items"], parallel=req_body["parallel"]))
+
+    results = jwt_service.analyze_token_batch(req_body["items"], parallel=req_body["parallel"])
+
+    return response(
+        data=[dict(result) for result in results],
+        message="Análisis por lotes completado correctamente.",
+        status=HTTPStatus.OK
+    )
+
+
+@jwt_bp.post("/audit")
+@validate_req_body(SecretAuditReqSchema)
+def audit_jwt_secret(req_body: JsonObject) -> HttpResponse:
+    try:
+        target = audit_target(req_body["token"])
+        wordlist = resolve_wordlist(req_body["wordlist"])
+    except ServiceException as e:
+        return error_response(message=e.get_message(), errors=e.get_errors(), status=e.get_status())
+
+    return ndjson_response(iter_secret_audit(target, wordlist, req_body["max_candidates"], req_body["max_seconds"]))
+
+
+@jwt_bp.get("/telemetry")
+def get_tm_telemetry() -> HttpResponse:
+    return response(
+        data=tm_telemetry.recorder.snapshot(),
+        message="Telemetría de la máquina de Turing obtenida correctamente.",
+        status=HTTPStatus.OK
+    )
+
+
+@jwt_bp.get("/cache")
+def get_cache_stats() -> HttpResponse:
+    return response(
+        data={"segments": segment_cache.stats(), "tokens": analysis_cache.stats()},
+        message="Estadísticas de caché obtenidas correctamente.",
+        status=HTTPStatus.OK
+    )
+
+
 @jwt_bp.get("/test-cases")
 def get_jwt_test_cases() -> HttpResponse:
     data = jwt_service.get_test_cases()
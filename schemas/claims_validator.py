@@ -0,0 +1,104 @@
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+from marshmallow import Schema, ValidationError, fields, validate, INCLUDE
+from marshmallow.decorators import VALIDATES
+
+from schemas.jwt_schemas import StrictInt
+from type_defs.json_types import JsonObject, ValidationErrors
+
+__all__ = ['compile_claims_validator']
+
+# Returns the error messages of one claim value, or None when it is valid.
+_ClaimCheck = Callable[[Any], Optional[List[str]]]
+
+
+def compile_claims_validator(schema_class: Type[Schema]) -> Callable[[JsonObject], ValidationErrors]:
+    """
+    Build a function that returns what ``schema_class().validate(data)`` does,
+    same messages and key order, for a flat claims schema such as
+    ``HeaderSchema`` or ``PayloadSchema``.
+
+    Type checks for ``Str`` and ``StrictInt`` fields are inlined; other fields
+    go through their own ``deserialize``. Validators, error messages and
+    ``@validates`` hooks are taken from the schema, so it stays the only place
+    where the rules are written down.
+    """
+    schema = schema_class()
+    if schema.unknown != INCLUDE or any(tag != VALIDATES for tag, hooks in schema_class._hooks.items() if hooks):
+        raise ValueError(f"{schema_class.__name__} cannot be compiled into a claims validator")
+
+    checks: List[Tuple[str, _ClaimCheck, Optional[str]]] = [
+        (field.data_key or name, _compile_field(field, name),
+         field.error_messages["required"] if field.required else None)
+        for name, field in schema.fields.items()
+    ]
+    hooks = [
+        (field_name, getattr(schema, attr_name))
+        for attr_name, _, hook_kwargs in schema_class._hooks[VALIDATES]
+        for field_name in hook_kwargs["field_names"]
+    ]
+
+    def validate_claims(data: JsonObject) -> ValidationErrors:
+        errors: ValidationErrors = {}
+
+        for name, check, required_message in checks:
+            if name not in data:
+                if required_message is not None:
+                    errors[name] = [required_message]
+                continue
+
+            messages = check(data[name])
+            if messages is not None:
+                errors[name] = messages
+
+        # Like marshmallow, hooks only see the fields that were loaded without errors.
+        for name, hook in hooks:
+            if name in data and name not in errors:
+                try:
+                    hook(data[name], data_key=name)
+                except ValidationError as e:
+                    errors[name] = e.messages
+
+        return errors
+
+    return validate_claims
+
+
+def _compile_field(field: fields.Field, name: str) -> _ClaimCheck:
+    null_messages = [field.error_messages["null"]]
+    validators = validate.And(*field.validators) if field.validators else None
+
+    if isinstance(field, StrictInt) or type(field) is fields.Str:
+        is_valid_type = _is_strict_int if isinstance(field, StrictInt) else _is_str
+        invalid_messages = [field.error_messages["invalid"]]
+
+        def check(value: Any) -> Optional[List[str]]:
+            if value is None:
+                return None if field.allow_none else list(null_messages)
+            if not is_valid_type(value):
+                return list(invalid_messages)
+            if validators is not None:
+                try:
+                    validators(value)
+                except ValidationError as e:
+                    return e.messages
+            return None
+
+        return check
+
+    def check_with_field(value: Any) -> Optional[List[str]]:
+        try:
+            field.deserialize(value, name, None)
+        except ValidationError as e:
+            return e.messages if isinstance(e.messages, list) else [e.messages]
+        return None
+
+    return check_with_field
+
+
+def _is_strict_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_str(value: Any) -> bool:
+    return isinstance(value, str)
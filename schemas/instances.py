@@ -0,0 +1,26 @@
+import threading
+from typing import Dict, Type, TypeVar
+
+from marshmallow import Schema
+
+__all__ = ['get_schema']
+
+S = TypeVar("S", bound=Schema)
+
+_local = threading.local()
+
+
+def get_schema(schema_class: Type[S]) -> S:
+    """
+    Return this thread's instance of ``schema_class``, created on first use.
+    Instances are reused instead of built per call, but never shared between
+    threads.
+    """
+    instances: Dict[type, Schema] = getattr(_local, "instances", None)
+    if instances is None:
+        instances = _local.instances = {}
+
+    schema = instances.get(schema_class)
+    if schema is None:
+        schema = instances[schema_class] = schema_class()
+    return schema
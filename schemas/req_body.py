@@ -1,6 +1,22 @@
-from marshmallow import Schema, fields, validates, ValidationError, validate, EXCLUDE
+import os
+
+from marshmallow import Schema, fields, validates, validates_schema, ValidationError, validate, EXCLUDE
 
 from schemas.jwt_schemas import HeaderSchema, PayloadSchema
+from services.keyring import keyring
+from utils.json.json_grammar import DERIVATION_FORMATS
+
+# Fields of each analysis stage that can be selected with "include". Syntactic
+# and semantic fields refer to the header and payload analyses alike.
+ANALYSIS_STAGE_FIELDS = {
+    "lexical": ("errors", "segments", "decoded"),
+    "syntactic": ("parsed", "derivation"),
+    "semantic": ("errors", "symbols", "metadata"),
+    "cryptographic": (),
+}
+ANALYSIS_SELECTORS = tuple(ANALYSIS_STAGE_FIELDS) + tuple(
+    f"{stage}.{field}" for stage, stage_fields in ANALYSIS_STAGE_FIELDS.items() for field in stage_fields
+)
 
 
 class BuildTokenReqSchema(Schema):
@@ -19,8 +35,9 @@ class BuildTokenReqSchema(Schema):
         error_messages={"required": 'El campo "payload" es obligatorio.'}
     )
 
+    # Optional when the header "kid" names a keyring key and keyring signing is enabled.
     secret = fields.Str(
-        required=True,
+        required=False,
         validate=validate.Length(min=8),
         error_messages={
             "required": 'La clave secreta es obligatoria.',
@@ -28,11 +45,26 @@ class BuildTokenReqSchema(Schema):
         }
     )
 
+    telemetry = fields.Bool(
+        required=False,
+        load_default=False,
+        error_messages={"invalid": 'El campo "telemetry" debe ser un valor booleano.'}
+    )
+
     @validates("payload")
     def validate_payload(self, value, **kwargs):
         if not value:
             raise ValidationError('El payload no puede estar vacío.')
 
+    @validates_schema(pass_original=True, skip_on_field_errors=False)
+    def validate_secret_or_kid(self, data, original_data, **kwargs):
+        if not isinstance(original_data, dict) or "secret" in original_data:
+            return
+
+        header = original_data.get("header")
+        if not isinstance(header, dict) or not keyring.can_sign(header.get("kid")):
+            raise ValidationError(self.fields["secret"].error_messages["required"], "secret")
+
 class AnalyzeTokenReqSchema(Schema):
     class Meta:
         unknown = EXCLUDE
@@ -48,4 +80,144 @@ class AnalyzeTokenReqSchema(Schema):
 
     secret = fields.Str(
         required=False,
-    )
\ No newline at end of file
+    )
+
+    derivation_format = fields.Str(
+        required=False,
+        load_default="expanded",
+        validate=validate.OneOf(
+            DERIVATION_FORMATS,
+            error='El campo "derivation_format" debe ser uno de: {choices}.'
+        )
+    )
+
+    include = fields.List(
+        fields.Str(
+            validate=validate.OneOf(
+                ANALYSIS_SELECTORS,
+                error='Cada elemento de "include" debe ser uno de: {choices}.'
+            )
+        ),
+        required=False,
+        load_default=None,
+        validate=validate.Length(min=1, error='El campo "include" no puede estar vacío.'),
+        error_messages={"invalid": 'El campo "include" debe ser una lista.'}
+    )
+
+    stream = fields.Bool(
+        required=False,
+        load_default=False,
+        error_messages={"invalid": 'El campo "stream" debe ser un valor booleano.'}
+    )
+
+
+ANALYZE_BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "1000"))
+
+
+class AnalyzeTokenBatchReqSchema(Schema):
+    """Items are checked one by one against ``AnalyzeTokenReqSchema`` so a bad item does not fail the batch."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    items = fields.List(
+        fields.Raw(),
+        required=True,
+        validate=validate.Length(
+            min=1,
+            max=ANALYZE_BATCH_MAX_ITEMS,
+            error='El campo "items" debe contener entre {min} y {max} elementos.'
+        ),
+        error_messages={
+            "required": 'El campo "items" es obligatorio.',
+            "invalid": 'El campo "items" debe ser una lista.'
+        }
+    )
+
+    parallel = fields.Bool(
+        required=False,
+        load_default=False,
+        error_messages={"invalid": 'El campo "parallel" debe ser un valor booleano.'}
+    )
+
+    stream = fields.Bool(
+        required=False,
+        load_default=False,
+        error_messages={"invalid": 'El campo "stream" debe ser un valor booleano.'}
+    )
+
+
+BUILD_BATCH_MAX_ITEMS = int(os.getenv("BUILD_BATCH_MAX_ITEMS", "50000"))
+
+
+class BuildTokenBatchReqSchema(Schema):
+    """Items are checked one by one against ``BuildTokenReqSchema`` so a bad item does not fail the batch."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    items = fields.List(
+        fields.Raw(),
+        required=True,
+        validate=validate.Length(
+            min=1,
+            max=BUILD_BATCH_MAX_ITEMS,
+            error='El campo "items" debe contener entre {min} y {max} elementos.'
+        ),
+        error_messages={
+            "required": 'El campo "items" es obligatorio.',
+            "invalid": 'El campo "items" debe ser una lista.'
+        }
+    )
+
+
+SECRET_AUDIT_MAX_CANDIDATES = int(os.getenv("SECRET_AUDIT_MAX_CANDIDATES", "1000000"))
+SECRET_AUDIT_MAX_SECONDS = float(os.getenv("SECRET_AUDIT_MAX_SECONDS", "30"))
+
+
+class SecretAuditReqSchema(Schema):
+    """The budgets may be lowered per request, never raised above the configured maximums."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    token = fields.Str(
+        required=True,
+        error_messages={
+            "required": 'El campo "token" es obligatorio.',
+            "null": 'El campo "token" no puede ser nulo.',
+            "invalid": 'El campo "token" debe ser una cadena válida.'
+        }
+    )
+
+    wordlist = fields.Str(
+        required=True,
+        validate=validate.Length(min=1, error='El campo "wordlist" no puede estar vacío.'),
+        error_messages={
+            "required": 'El campo "wordlist" es obligatorio.',
+            "invalid": 'El campo "wordlist" debe ser el nombre de una lista de palabras.'
+        }
+    )
+
+    max_candidates = fields.Int(
+        required=False,
+        load_default=SECRET_AUDIT_MAX_CANDIDATES,
+        validate=validate.Range(
+            min=1,
+            max=SECRET_AUDIT_MAX_CANDIDATES,
+            error='El campo "max_candidates" debe estar entre {min} y {max}.'
+        ),
+        error_messages={"invalid": 'El campo "max_candidates" debe ser un entero.'}
+    )
+
+    max_seconds = fields.Float(
+        required=False,
+        load_default=SECRET_AUDIT_MAX_SECONDS,
+        validate=validate.Range(
+            min=0,
+            max=SECRET_AUDIT_MAX_SECONDS,
+            min_inclusive=False,
+            error='El campo "max_seconds" debe ser mayor que {min} y como máximo {max}.'
+        ),
+        error_messages={"invalid": 'El campo "max_seconds" debe ser un número.'}
+    )
@@ -1,49 +1,116 @@
 import datetime
+import hashlib
 import hmac
 import json
+import logging
+import os
 import re
+import secrets
 import time
-from typing import List, Type, Optional
+from typing import Any, Dict, FrozenSet, Iterator, List, Type, Optional, Tuple, Union
 
 from datetime import datetime
-from marshmallow import Schema
+from marshmallow import Schema, ValidationError
 
 from domain.signing_algorithm import SigningAlgorithm
+from schemas.claims_validator import compile_claims_validator
+from schemas.instances import get_schema
 from schemas.jwt_schemas import HeaderSchema, PayloadSchema
+from schemas.req_body import AnalyzeTokenReqSchema, BuildTokenReqSchema, ANALYSIS_STAGE_FIELDS
 from services.firebase_client import get_db
-from type_defs.json_types import JsonObject, ValidationErrors
-from type_defs.jwt_types import TokenCreationResult, LexicalAnalysisResult, TokenSegment, TokenSegments, \
+from services.keyring import keyring
+from turing_machine import telemetry as tm_telemetry
+from type_defs.json_types import JsonObject, JsonValue, ValidationErrors
+from type_defs.jwt_types import TokenCreationResult, LexicalAnalysisResult, TokenSegments, \
     DecodedComponents, SyntacticComponentAnalysisResult, SyntacticAnalysisResult, SemanticAnalysisResult, \
-    ComponentSemanticAnalysisResult, AnalyzeTokenResult, TokenTestCase, TokenMeta
-from utils.base64 import encode_base64_url, decode_base64_url
-from utils.json import parse_json, analyze_json_grammar
+    ComponentSemanticAnalysisResult, AnalyzeTokenResult, TokenTestCase, TokenMeta, SegmentTelemetry, \
+    BatchAnalysisItem, BatchBuildItem, BatchStageRecord
+from utils.base64 import encode_base64_url, decode_base64_url, ENCODER_BACKEND, base64url_to_standard, \
+    decode_base64_unpadded
+from utils.json import parse_json, parse_json_tree, analyze_json_tree
+from utils.json.json_grammar import DerivationResult, DeltaDerivationResult, count_tree_nodes
+from utils.json.json_parse import json_nesting_depth
 from utils.json.symbol_table import build_symbol_table
+from utils.lru_cache import LRUCache
+from utils.process_pool import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Decoded headers (and many payloads) repeat across requests, so the analysis
+# of each segment text is memoized. Nothing cached here depends on the clock.
+segment_cache: LRUCache = LRUCache(
+    max_entries=int(os.getenv("SEGMENT_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("SEGMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
+
+# Whole analyses, keyed on the token and a keyed hash of the secret (never the
+# secret itself). Entries live at most ANALYSIS_CACHE_TTL seconds and never past
+# the token's "exp"; on a hit only the expiration metadata is recomputed.
+analysis_cache: LRUCache = LRUCache(
+    max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
+_ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "300"))
+_SECRET_HASH_KEY = os.getenv("ANALYSIS_CACHE_KEY", "").encode() or secrets.token_bytes(32)
+
+# Batches smaller than this are analyzed in-process even when "parallel" is requested.
+_BATCH_PARALLEL_MIN_ITEMS = int(os.getenv("ANALYZE_BATCH_PARALLEL_MIN_ITEMS", "64"))
+_BATCH_MAX_WORKERS = int(os.getenv("ANALYZE_BATCH_MAX_WORKERS", "0")) or os.cpu_count() or 1
+
+# Building is only worth spreading over processes when a Turing machine encodes the segments.
+_BUILD_BATCH_PARALLEL_MIN_ITEMS = int(os.getenv("BUILD_BATCH_PARALLEL_MIN_ITEMS", "256"))
+
+# The registered claims are checked by validators compiled from the schemas,
+# which give the same errors as marshmallow without its per-call machinery.
+_CLAIM_VALIDATORS = {schema: compile_claims_validator(schema) for schema in (HeaderSchema, PayloadSchema)}
+
+_SEGMENT_NAMES = ("header", "payload", "signature")
+_BASE64URL_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+_ALPHABET_ERRORS = (
+    ("header", "El segmento header no es una cadena codificada en base64url"),
+    ("payload", "el segmento payload no es una cadena codificada en base64url"),
+    ("signature", "El segmento signature no es una cadena codificada en base64url"),
+)
+
+# Work budgets for a single analysis. The stage that runs into one stops there
+# and names it under "limit_exceeded" instead of finishing the work.
+_MAX_TOKEN_LENGTH = int(os.getenv("ANALYZE_MAX_TOKEN_LENGTH", "65536"))
+_MAX_SEGMENT_BYTES = int(os.getenv("ANALYZE_MAX_SEGMENT_BYTES", "32768"))
+_MAX_JSON_DEPTH = int(os.getenv("ANALYZE_MAX_JSON_DEPTH", "64"))
+_MAX_TREE_NODES = int(os.getenv("ANALYZE_MAX_TREE_NODES", "20000"))
+_MAX_DERIVATION_STEPS = int(os.getenv("ANALYZE_MAX_DERIVATION_STEPS", "2000"))
 
 
 class JwtService:
 
-    def create_signature_hmac(self, message: str, secret: str, alg: SigningAlgorithm) -> str:
-        hash_function = alg.get_hash_function()
-        raw_sig = hmac.new(
-            secret.encode(),
-            message.encode(),
-            hash_function
-        ).digest()
-        return encode_base64_url(raw_sig)
+    def create_signature_hmac(self, message: str, secret: Optional[str], alg: SigningAlgorithm,
+                              telemetry: Optional[SegmentTelemetry] = None, kid: Optional[str] = None) -> str:
+        """Sign with ``secret`` or, when it is None, with the keyring key ``kid``."""
+        if secret is not None:
+            mac = hmac.new(secret.encode(), message.encode(), alg.get_hash_function())
+        else:
+            mac = keyring.new_hmac(kid, alg)
+            mac.update(message.encode())
+        return self._encode_segment(mac.digest(), "signature", telemetry)
 
-    def build_token(self, header: JsonObject, payload: JsonObject, secret_key: str) -> TokenCreationResult:
-        encoded_header = encode_base64_url(json.dumps(header, separators=(',', ':')))
-        encoded_payload = encode_base64_url(json.dumps(payload, separators=(',', ':')))
+    def build_token(self, header: JsonObject, payload: JsonObject, secret_key: Optional[str],
+                    include_telemetry: bool = False) -> TokenCreationResult:
+        telemetry: Optional[SegmentTelemetry] = {} if include_telemetry else None
+
+        encoded_header = self._encode_segment(json.dumps(header, separators=(',', ':')), "header", telemetry)
+        encoded_payload = self._encode_segment(json.dumps(payload, separators=(',', ':')), "payload", telemetry)
 
         algorithm = SigningAlgorithm(header.get("alg"))
 
         encoded_signature = self.create_signature_hmac(
             message=f"{encoded_header}.{encoded_payload}",
             secret=secret_key,
-            alg=algorithm
+            alg=algorithm,
+            telemetry=telemetry,
+            kid=header.get("kid")
         )
 
-        return {
+        result: TokenCreationResult = {
             "token": f"{encoded_header}.{encoded_payload}.{encoded_signature}",
             "parts": {
                 "header": encoded_header,
@@ -52,54 +119,256 @@ class JwtService:
             }
         }
 
-    def analyze_token(self, token: str, secret: Optional[str]) -> AnalyzeTokenResult:
-        lexical_analysis = self.lexical_analysis(token)
-        analysis_result: AnalyzeTokenResult = {
-            "lexical": lexical_analysis
-        }
-        if lexical_analysis["errors"]:
-            return analysis_result
+        if telemetry is not None:
+            result["parts"]["telemetry"] = telemetry
+
+        return result
+
+    def _encode_segment(self, data: Union[str, bytes], name: str, telemetry: Optional[SegmentTelemetry]) -> str:
+        if telemetry is None or not tm_telemetry.ENABLED:
+            return encode_base64_url(data)
 
-        syntactic_analysis = self.syntactic_analysis(lexical_analysis["decoded"])
+        with tm_telemetry.capture() as runs:
+            encoded = encode_base64_url(data)
 
-        analysis_result["syntactic"] = syntactic_analysis
+        telemetry[name] = [run.to_dict() for run in runs]
+        return encoded
 
-        if "error" in syntactic_analysis["header"] or "error" in syntactic_analysis["payload"]:
+    def analyze_token(self, token: str, secret: Optional[str], derivation_format: str = "expanded",
+                      include: Optional[List[str]] = None) -> AnalyzeTokenResult:
+        analysis_result: AnalyzeTokenResult = dict(self.iter_token_analysis(token, secret, derivation_format, include))
+        return analysis_result
+
+    def iter_token_analysis(self, token: str, secret: Optional[str], derivation_format: str = "expanded",
+                            include: Optional[List[str]] = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield ``(stage, result)`` for the lexical, syntactic, semantic and
+        cryptographic stages as each one completes, stopping where
+        ``analyze_token`` would. A fully consumed analysis is cached.
+
+        ``include`` lists the stages and ``stage.field`` selectors to return
+        (see ``ANALYSIS_STAGE_FIELDS``); anything else is left out and, where
+        no later stage needs it, not computed. None returns everything.
+        """
+        projection = _analysis_projection(include)
+        key = (token, _secret_digest(secret), derivation_format, None if include is None else tuple(sorted(set(include))))
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            yield from self._refresh_metadata(*cached).items()
+            return
+
+        computed: AnalyzeTokenResult = {}
+        analysis_result: AnalyzeTokenResult = {}
+        for stage, result, last in self._iter_analysis_stages(token, secret, derivation_format, projection):
+            computed[stage] = result
+            projected = _project_stage(stage, result, projection) if _includes(projection, stage) else None
+
+            # When a selected stage is not reached, the errors of the stage that stopped the analysis say why.
+            if last and projection is not None and not projection.keys() <= computed.keys():
+                projected = _with_stage_errors(stage, projected or {}, result)
+
+            if projected is not None:
+                analysis_result[stage] = projected
+                yield stage, projected
+
+        # The payload is kept along with a result whose expiration metadata must be refreshed on every hit.
+        parsed_payload = None
+        if "semantic" in analysis_result and _includes(projection, "semantic", "metadata"):
+            parsed_payload = computed["syntactic"]["payload"]["parsed"]
+
+        expires_at = time.time() + _ANALYSIS_CACHE_TTL
+        if parsed_payload is not None and isinstance(parsed_payload.get("exp"), int):
+            expires_at = min(expires_at, parsed_payload["exp"])
+
+        analysis_cache.put(key, (analysis_result, parsed_payload), _analysis_result_size(token, computed),
+                           expires_at=expires_at)
+
+    def analyze_token_batch(self, items: List[JsonValue], parallel: bool = False) -> List[BatchAnalysisItem]:
+        """
+        Analyze every item like a single ``/jwt/analyze`` request body, keeping
+        the input order. An invalid item or a failed analysis is reported in
+        that item's entry and does not affect the others.
+        """
+        entries, pending = _load_batch_items(items, get_schema(AnalyzeTokenReqSchema))
+        requests = [(index, request["token"], request.get("secret"), request["derivation_format"], request["include"])
+                    for index, request in pending]
+
+        if parallel and len(requests) >= _BATCH_PARALLEL_MIN_ITEMS and _BATCH_MAX_WORKERS > 1:
+            pool = get_process_pool("jwt_batch", _BATCH_MAX_WORKERS)
+            chunk_size = max(1, len(requests) // (_BATCH_MAX_WORKERS * 4))
+            analyzed = pool.map(_analyze_batch_item, requests, chunksize=chunk_size)
+        else:
+            analyzed = map(_analyze_batch_item, requests)
+
+        for entry in analyzed:
+            entries[entry["index"]] = entry
+
+        return entries
+
+    def iter_token_batch_stages(self, items: List[JsonValue], parallel: bool = False) -> Iterator[BatchStageRecord]:
+        """
+        Like ``analyze_token_batch``, but yield one record per item and stage as
+        soon as it is ready, so only a bounded window of results is held. With
+        ``parallel``, windows of items are analyzed in the process pool and
+        their stages are yielded once the window completes.
+        """
+        entries, pending = _load_batch_items(items, get_schema(AnalyzeTokenReqSchema))
+        requests = {index: (index, request["token"], request.get("secret"), request["derivation_format"],
+                            request["include"])
+                    for index, request in pending}
+        use_pool = parallel and len(requests) >= _BATCH_PARALLEL_MIN_ITEMS and _BATCH_MAX_WORKERS > 1
+        window = _BATCH_MAX_WORKERS * 16 if use_pool else 1
+
+        for start in range(0, len(entries), window):
+            indexes = range(start, min(start + window, len(entries)))
+            if use_pool:
+                pool = get_process_pool("jwt_batch", _BATCH_MAX_WORKERS)
+                analyzed = pool.map(_analyze_batch_item, [requests[i] for i in indexes if i in requests])
+                for entry in analyzed:
+                    entries[entry["index"]] = entry
+
+            for index in indexes:
+                entry = entries[index]
+                if entry is None:
+                    yield from _iter_item_stages(self, *requests[index])
+                elif "error" in entry:
+                    yield entry
+                else:
+                    for stage, result in entry["result"].items():
+                        yield {"index": index, "stage": stage, "data": result}
+                # Drop the finished entry so a long batch does not accumulate results.
+                entries[index] = None
+
+    def build_token_batch(self, items: List[JsonValue]) -> List[BatchBuildItem]:
+        """
+        Build a token for every item, each shaped like a ``/jwt/build`` request
+        body, keeping the input order. Identical headers and payloads are
+        encoded once, and the HMAC key schedule is computed once per secret.
+        """
+        results, requests = _load_batch_items(items, get_schema(BuildTokenReqSchema))
+        pending = [(index, request["header"], request["payload"], request.get("secret")) for index, request in requests]
+
+        if ENCODER_BACKEND != "native" and len(pending) >= _BUILD_BATCH_PARALLEL_MIN_ITEMS and _BATCH_MAX_WORKERS > 1:
+            pool = get_process_pool("jwt_batch", _BATCH_MAX_WORKERS)
+            chunk_size = -(-len(pending) // (_BATCH_MAX_WORKERS * 4))
+            chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+            built = [entry for chunk in pool.map(_build_token_chunk, chunks) for entry in chunk]
+        else:
+            built = _build_token_chunk(pending)
+
+        for entry in built:
+            results[entry["index"]] = entry
+
+        return results
+
+    def _refresh_metadata(self, analysis_result: AnalyzeTokenResult,
+                          parsed_payload: Optional[JsonObject]) -> AnalyzeTokenResult:
+        if parsed_payload is None:
             return analysis_result
 
+        semantic: SemanticAnalysisResult = dict(analysis_result["semantic"])
+        semantic.pop("metadata", None)
+        meta = self._token_metadata(parsed_payload)
+        if meta is not None:
+            semantic["metadata"] = meta
+
+        refreshed: AnalyzeTokenResult = dict(analysis_result)
+        refreshed["semantic"] = semantic
+        return refreshed
+
+    def _iter_analysis_stages(self, token: str, secret: Optional[str], derivation_format: str,
+                              projection: Optional[Dict[str, FrozenSet[str]]] = None) -> Iterator[Tuple[str, Any, bool]]:
+        """
+        Run the stages up to the last one ``projection`` asks for, computing
+        only the fields it selects plus what later stages depend on. Each
+        stage comes with whether the analysis stops after it.
+        """
+        wants_signature = _includes(projection, "cryptographic")
+
+        lexical_analysis = self.lexical_analysis(token)
+        last = bool(lexical_analysis["errors"]) or \
+            not (wants_signature or _includes(projection, "syntactic") or _includes(projection, "semantic"))
+        yield "lexical", lexical_analysis, last
+        if last:
+            return
+
+        syntactic_analysis = self.syntactic_analysis(
+            lexical_analysis["decoded"],
+            derivation_format if _includes(projection, "syntactic", "derivation") else None
+        )
+        last = "error" in syntactic_analysis["header"] or "error" in syntactic_analysis["payload"] or \
+            not (wants_signature or _includes(projection, "semantic"))
+        yield "syntactic", syntactic_analysis, last
+        if last:
+            return
+
+        # The signature is only checked when the header passes validation, so "alg" errors are always needed for it.
+        semantic_fields = frozenset(
+            field for field in ANALYSIS_STAGE_FIELDS["semantic"]
+            if _includes(projection, "semantic", field) or (field == "errors" and wants_signature)
+        )
         parsed_header = syntactic_analysis["header"]["parsed"]
         parsed_payload = syntactic_analysis["payload"]["parsed"]
         semantic_analysis = self.semantic_analysis(
             parsed_header=parsed_header,
-            parsed_payload=parsed_payload
+            parsed_payload=parsed_payload,
+            decoded_components=lexical_analysis["decoded"],
+            fields=semantic_fields
         )
 
-        analysis_result["semantic"] = semantic_analysis
-
-        if not secret or semantic_analysis["header"]["errors"].get("alg", None):
-            return analysis_result
+        # Without a secret, the signature can still be checked with the keyring key the header names.
+        kid = None if secret else parsed_header.get("kid")
+        last = not wants_signature or bool(semantic_analysis["header"]["errors"].get("alg", None)) or \
+            (not secret and kid not in keyring)
+        yield "semantic", semantic_analysis, last
+        if last:
+            return
 
         signature_valid = self.check_signature(
             segments=lexical_analysis["segments"],
             alg=SigningAlgorithm(parsed_header["alg"]),
-            secret=secret
+            secret=secret or None,
+            kid=kid
         )
+        yield "cryptographic", signature_valid, True
 
-        analysis_result["cryptographic"] = signature_valid
-
-        return analysis_result
-
-    def syntactic_analysis(self, decoded_components: DecodedComponents) -> SyntacticAnalysisResult:
-        header_result = self._parse_segment(decoded_components["header"])
-        payload_result = self._parse_segment(decoded_components["payload"])
+    def syntactic_analysis(self, decoded_components: DecodedComponents,
+                           derivation_format: Optional[str] = "expanded") -> SyntacticAnalysisResult:
+        """With ``derivation_format`` None only the parsed objects (or the errors) are returned."""
+        header_result = self._parse_segment(decoded_components["header"], derivation_format)
+        payload_result = self._parse_segment(decoded_components["payload"], derivation_format)
 
         return {
             "header": header_result,
             "payload": payload_result
         }
 
-    def _parse_segment(self, json_string: str) -> SyntacticComponentAnalysisResult:
-        parse_result = parse_json(text=json_string)
+    def _parse_segment(self, json_string: str,
+                       derivation_format: Optional[str] = "expanded") -> SyntacticComponentAnalysisResult:
+        key = ("syntactic", derivation_format, json_string)
+        result = segment_cache.get(key)
+        if result is None:
+            result = self._parse_segment_uncached(json_string, derivation_format)
+            segment_cache.put(key, result, _syntactic_result_size(json_string, result))
+        return result
+
+    def _parse_segment_uncached(self, json_string: str,
+                                derivation_format: Optional[str]) -> SyntacticComponentAnalysisResult:
+        if json_nesting_depth(json_string, limit=_MAX_JSON_DEPTH) > _MAX_JSON_DEPTH:
+            return {
+                "error": {
+                    "message": f"El JSON supera la profundidad máxima de anidamiento de {_MAX_JSON_DEPTH} niveles."
+                },
+                "limit_exceeded": {"limit": "json_depth", "max": _MAX_JSON_DEPTH}
+            }
+
+        if derivation_format is not None:
+            parse_result, tree = parse_json_tree(text=json_string)
+        else:
+            # Without a derivation the grammar is only needed to reject what json.loads takes but it does not.
+            parse_result, tree = parse_json(text=json_string), None
+            if parse_result.valid and ("NaN" in json_string or "Infinity" in json_string):
+                parse_result, tree = parse_json_tree(text=json_string)
         if not parse_result.valid:
             return {
                 "error": {
@@ -118,68 +387,84 @@ class JwtService:
                 }
             }
 
-        grammar_result = analyze_json_grammar(json_string=json_string)
-        return {
+        if derivation_format is None:
+            return {"parsed": parse_result.parsed}
+
+        rules, tokens = count_tree_nodes(tree)
+        if rules + tokens > _MAX_TREE_NODES:
+            return {
+                "parsed": parse_result.parsed,
+                "limit_exceeded": {"limit": "tree_nodes", "max": _MAX_TREE_NODES}
+            }
+
+        grammar_result = analyze_json_tree(tree, derivation_format=derivation_format, max_steps=_MAX_DERIVATION_STEPS)
+        result: SyntacticComponentAnalysisResult = {
             "parsed": parse_result.parsed,
             "derivation": grammar_result
         }
 
+        # One derivation step per rule node: the steps were cut short.
+        if rules > _MAX_DERIVATION_STEPS:
+            result["limit_exceeded"] = {"limit": "derivation_steps", "max": _MAX_DERIVATION_STEPS}
+        return result
+
     def lexical_analysis(self, token: str) -> LexicalAnalysisResult:
         errors: List[str] = []
 
-        parts = token.split('.')
-        if len(parts) != 3:
+        if len(token) > _MAX_TOKEN_LENGTH:
+            errors.append(f"El token supera la longitud máxima de {_MAX_TOKEN_LENGTH} caracteres.")
+            return {"errors": errors, "limit_exceeded": {"limit": "token_length", "max": _MAX_TOKEN_LENGTH}}
+
+        first_dot = token.find(".")
+        second_dot = token.find(".", first_dot + 1) if first_dot >= 0 else -1
+        if second_dot < 0 or token.find(".", second_dot + 1) >= 0:
             errors.append("El token debe contener exactamente tres segmentos separados por puntos")
             return {"errors": errors}
 
-        header_seg, payload_seg, signature_seg = parts
-
-        start = 0
-        end = len(header_seg)
-        header_segment: TokenSegment = {"value": header_seg, "start": start, "end": end}
-
-        start = end + 1
-        end = start + len(payload_seg)
-        payload_segment: TokenSegment = {"value": payload_seg, "start": start, "end": end}
-
-        start = end + 1
-        end = start + len(signature_seg)
-        signature_segment: TokenSegment = {"value": signature_seg, "start": start, "end": end}
-
+        bounds = ((0, first_dot), (first_dot + 1, second_dot), (second_dot + 1, len(token)))
         segments: TokenSegments = {
-            "header": header_segment,
-            "payload": payload_segment,
-            "signature": signature_segment
+            name: {"value": token[start:end], "start": start, "end": end}
+            for name, (start, end) in zip(_SEGMENT_NAMES, bounds)
         }
 
-        base64url_pattern = re.compile(r'^[A-Za-z0-9_-]+$')
-
-        if not base64url_pattern.match(header_seg):
-            errors.append("El segmento header no es una cadena codificada en base64url")
-
-        if not base64url_pattern.match(payload_seg):
-            errors.append("el segmento payload no es una cadena codificada en base64url")
-
-        if not base64url_pattern.match(signature_seg):
-            errors.append("El segmento signature no es una cadena codificada en base64url")
-
-        if errors:
-            return {"segments": segments, "errors": errors}
-
-        decoded_header = None
-        try:
-            decoded_header = decode_base64_url(header_seg)
-        except ValueError:
-            errors.append(
-                "El segmento header no contiene texto UTF-8 válido. El token puede estar corrupto o no ser un JWT estándar.")
-
-        decoded_payload = None
-        try:
-            decoded_payload = decode_base64_url(payload_seg)
-        except ValueError:
-            errors.append(
-                "El segmento payload no contiene texto UTF-8 válido. El token puede estar corrupto o no ser un JWT estándar.")
+        # One translation validates the alphabet of the whole token and maps it for decoding in place. Only
+        # a token it rejects goes through the pattern, which tells the segments apart (and lets a segment
+        # end in "\n", as "$" always has).
+        standard = base64url_to_standard(token)
+        if standard is None or any(start == end for start, end in bounds):
+            for name, message in _ALPHABET_ERRORS:
+                if not _BASE64URL_PATTERN.match(segments[name]["value"]):
+                    errors.append(message)
+
+            if errors:
+                return {"segments": segments, "errors": errors}
+
+        # Six bits per base64url character: the decoded size is known before decoding.
+        for name in ("header", "payload"):
+            if len(segments[name]["value"]) * 3 // 4 > _MAX_SEGMENT_BYTES:
+                errors.append(f"El segmento {name} supera el tamaño máximo de {_MAX_SEGMENT_BYTES} bytes decodificado.")
+                return {
+                    "segments": segments,
+                    "errors": errors,
+                    "limit_exceeded": {"limit": "segment_size", "max": _MAX_SEGMENT_BYTES, "segment": name}
+                }
 
+        view = memoryview(standard) if standard is not None else None
+        decoded_segments: Dict[str, Optional[str]] = {}
+        for name, (start, end) in zip(("header", "payload"), bounds):
+            try:
+                if view is not None:
+                    decoded_segments[name] = decode_base64_unpadded(view[start:end])
+                else:
+                    decoded_segments[name] = decode_base64_url(segments[name]["value"])
+            except ValueError:
+                decoded_segments[name] = None
+                errors.append(
+                    f"El segmento {name} no contiene texto UTF-8 válido. "
+                    "El token puede estar corrupto o no ser un JWT estándar.")
+
+        decoded_header = decoded_segments["header"]
+        decoded_payload = decoded_segments["payload"]
         if decoded_header is None or decoded_payload is None:
             if len(errors) == 0:
                 errors.append("Error desconocido al decodificar los segmentos del token.")
@@ -193,45 +478,74 @@ class JwtService:
 
         return {"errors": errors, "segments": segments, "decoded": decoded}
 
-    def semantic_analysis(self, parsed_header: JsonObject, parsed_payload: JsonObject) -> SemanticAnalysisResult:
-        result: SemanticAnalysisResult = {
-            "header": self._semantic_analysis_segment(parsed_header, schema=HeaderSchema),
-            "payload": self._semantic_analysis_segment(parsed_payload, schema=PayloadSchema)
-        }
-
-        if parsed_payload.get("exp", None) is not None and isinstance(parsed_payload["exp"], int):
-            expiration = datetime.fromtimestamp(parsed_payload["exp"]).strftime("%Y-%m-%d %H:%M:%S")
-            expired = int(time.time()) >= parsed_payload["exp"]
-
-            meta: TokenMeta = {
-                "expiration": expiration,
-                "expired": expired
-            }
-
+    def semantic_analysis(self, parsed_header: JsonObject, parsed_payload: JsonObject,
+                          decoded_components: Optional[DecodedComponents] = None,
+                          fields: FrozenSet[str] = frozenset(ANALYSIS_STAGE_FIELDS["semantic"])) -> SemanticAnalysisResult:
+        header_source = decoded_components["header"] if decoded_components else None
+        payload_source = decoded_components["payload"] if decoded_components else None
+        segment_fields = tuple(field for field in ("errors", "symbols") if field in fields)
+
+        result: SemanticAnalysisResult = {}
+        if segment_fields:
+            result["header"] = self._semantic_analysis_segment(
+                parsed_header, schema=HeaderSchema, source=header_source, fields=segment_fields
+            )
+            result["payload"] = self._semantic_analysis_segment(
+                parsed_payload, schema=PayloadSchema, source=payload_source, fields=segment_fields
+            )
+
+        # The expiration metadata depends on the current time, so it is never cached.
+        meta = self._token_metadata(parsed_payload) if "metadata" in fields else None
+        if meta is not None:
             result["metadata"] = meta
 
         return result
 
-    def _semantic_analysis_segment(self, data: JsonObject, schema: Type[Schema]) -> ComponentSemanticAnalysisResult:
-        errors = self._validate_fields(data, schema)
-        symbols = build_symbol_table(data)
+    def _token_metadata(self, parsed_payload: JsonObject) -> Optional[TokenMeta]:
+        if parsed_payload.get("exp", None) is None or not isinstance(parsed_payload["exp"], int):
+            return None
+
+        expiration = datetime.fromtimestamp(parsed_payload["exp"]).strftime("%Y-%m-%d %H:%M:%S")
+        expired = int(time.time()) >= parsed_payload["exp"]
 
         return {
-            "errors": errors,
-            "symbols": symbols
+            "expiration": expiration,
+            "expired": expired
         }
 
+    def _semantic_analysis_segment(self, data: JsonObject, schema: Type[Schema], source: Optional[str] = None,
+                                   fields: Tuple[str, ...] = ("errors", "symbols")) -> ComponentSemanticAnalysisResult:
+        """``source`` is the JSON text ``data`` was parsed from; when given, the result is memoized on it."""
+        key = ("semantic", schema.__name__, fields, source)
+        result = segment_cache.get(key) if source is not None else None
+        if result is not None:
+            return result
+
+        result = {}
+        if "errors" in fields:
+            result["errors"] = self._validate_fields(data, schema)
+        if "symbols" in fields:
+            result["symbols"] = build_symbol_table(data)
+
+        if source is not None:
+            segment_cache.put(key, result, _semantic_result_size(source, result))
+        return result
+
     def _validate_fields(self, data: JsonObject, schema: Type[Schema]) -> ValidationErrors:
-        schema_instance = schema()
-        return schema_instance.validate(data)
+        validate_claims = _CLAIM_VALIDATORS.get(schema)
+        if validate_claims is not None:
+            return validate_claims(data)
+        return get_schema(schema).validate(data)
 
-    def check_signature(self, segments: TokenSegments, alg: SigningAlgorithm, secret: str) -> bool:
+    def check_signature(self, segments: TokenSegments, alg: SigningAlgorithm, secret: Optional[str],
+                        kid: Optional[str] = None) -> bool:
         token_signature = segments["signature"]["value"]
         message = f"{segments['header']['value']}.{segments['payload']['value']}"
         expected_signature = self.create_signature_hmac(
             message=message,
             secret=secret,
-            alg=alg
+            alg=alg,
+            kid=kid
         )
 
         return hmac.compare_digest(token_signature, expected_signature)
@@ -246,3 +560,215 @@ class JwtService:
             test_cases.append(doc.to_dict())
 
         return test_cases
+
+
+# Rough sizes in bytes (one per character plus a fixed overhead per object), for the segment cache budget.
+_OBJECT_OVERHEAD = 64
+
+
+def _syntactic_result_size(json_string: str, result: SyntacticComponentAnalysisResult) -> int:
+    size = 3 * len(json_string)
+    derivation = result.get("derivation")
+
+    if isinstance(derivation, DerivationResult):
+        size += len(derivation.tree)
+        for step in derivation.steps:
+            size += len(step.result) + len(step.production.target) + _OBJECT_OVERHEAD
+    elif isinstance(derivation, DeltaDerivationResult):
+        size += len(derivation.tree)
+        for step in derivation.steps:
+            size += 2 * len(step.production.target) + _OBJECT_OVERHEAD
+
+    return size
+
+
+def _load_batch_items(items: List[JsonValue], schema: Schema) -> Tuple[List[Optional[dict]], List[Tuple[int, dict]]]:
+    """
+    Validate each batch item against ``schema``. Returns one slot per item,
+    holding the error entry of invalid items and None otherwise, and the
+    ``(index, request)`` pairs of the valid ones.
+    """
+    entries: List[Optional[dict]] = [None] * len(items)
+    requests = []
+
+    for index, item in enumerate(items):
+        try:
+            request = schema.load(item if isinstance(item, dict) else {})
+        except ValidationError as e:
+            entries[index] = {
+                "index": index,
+                "error": {"message": "Elemento inválido.", "details": e.messages}
+            }
+            continue
+        requests.append((index, request))
+
+    return entries, requests
+
+
+def _iter_item_stages(service: "JwtService", index: int, token: str, secret: Optional[str],
+                      derivation_format: str, include: Optional[List[str]]) -> Iterator[BatchStageRecord]:
+    try:
+        for stage, result in service.iter_token_analysis(token, secret, derivation_format, include):
+            yield {"index": index, "stage": stage, "data": result}
+    except Exception:
+        logger.exception("Batch analysis failed for item %d", index)
+        yield {"index": index, "error": {"message": "Se produjo un error interno al analizar el token."}}
+
+
+_batch_service: Optional[JwtService] = None
+
+
+def _analyze_batch_item(item: Tuple[int, str, Optional[str], str, Optional[List[str]]]) -> BatchAnalysisItem:
+    global _batch_service
+
+    index, token, secret, derivation_format, include = item
+    if _batch_service is None:
+        _batch_service = JwtService()
+
+    try:
+        return {"index": index, "result": _batch_service.analyze_token(token, secret, derivation_format, include)}
+    except Exception:
+        logger.exception("Batch analysis failed for item %d", index)
+        return {"index": index, "error": {"message": "Se produjo un error interno al analizar el token."}}
+
+
+class _BatchTokenBuilder:
+    """
+    Builds tokens like ``JwtService.build_token``, remembering encoded
+    segments and keyed HMAC objects. Items without a secret, which
+    ``BuildTokenReqSchema`` only lets through when keyring signing is
+    enabled, are signed with the keyring key their header names.
+    """
+
+    def __init__(self):
+        self._segments: Dict[str, str] = {}
+        self._macs: Dict[Tuple[str, SigningAlgorithm], "hmac.HMAC"] = {}
+
+    def build(self, header: JsonObject, payload: JsonObject, secret: Optional[str]) -> TokenCreationResult:
+        encoded_header = self._encode_json(header)
+        encoded_payload = self._encode_json(payload)
+
+        algorithm = SigningAlgorithm(header.get("alg"))
+        if secret is None:
+            mac = keyring.new_hmac(header.get("kid"), algorithm)
+        else:
+            mac = self._macs.get((secret, algorithm))
+            if mac is None:
+                mac = hmac.new(secret.encode(), digestmod=algorithm.get_hash_function())
+                self._macs[(secret, algorithm)] = mac
+            mac = mac.copy()
+
+        mac.update(f"{encoded_header}.{encoded_payload}".encode())
+        encoded_signature = encode_base64_url(mac.digest())
+
+        return {
+            "token": f"{encoded_header}.{encoded_payload}.{encoded_signature}",
+            "parts": {
+                "header": encoded_header,
+                "payload": encoded_payload,
+                "signature": encoded_signature
+            }
+        }
+
+    def _encode_json(self, data: JsonObject) -> str:
+        text = json.dumps(data, separators=(',', ':'))
+        encoded = self._segments.get(text)
+        if encoded is None:
+            encoded = encode_base64_url(text)
+            self._segments[text] = encoded
+        return encoded
+
+
+def _build_token_chunk(items: List[Tuple[int, JsonObject, JsonObject, Optional[str]]]) -> List[BatchBuildItem]:
+    builder = _BatchTokenBuilder()
+    results: List[BatchBuildItem] = []
+
+    for index, header, payload, secret in items:
+        try:
+            results.append({"index": index, "result": builder.build(header, payload, secret)})
+        except Exception:
+            logger.exception("Batch build failed for item %d", index)
+            results.append({"index": index, "error": {"message": "Se produjo un error interno al crear el token."}})
+
+    return results
+
+
+def _secret_digest(secret: Optional[str]) -> Optional[bytes]:
+    if secret is None:
+        return None
+    return hmac.new(_SECRET_HASH_KEY, secret.encode(), hashlib.sha256).digest()
+
+
+def _analysis_result_size(token: str, result: AnalyzeTokenResult) -> int:
+    size = 3 * len(token)
+    decoded = result["lexical"].get("decoded")
+
+    for name, segment in result.get("syntactic", {}).items():
+        size += _syntactic_result_size(decoded[name], segment)
+    for name in ("header", "payload"):
+        if name in result.get("semantic", {}):
+            size += _semantic_result_size(decoded[name], result["semantic"][name])
+
+    return size
+
+
+def _semantic_result_size(json_string: str, result: ComponentSemanticAnalysisResult) -> int:
+    size = len(json_string) + len(str(result.get("errors", "")))
+    for symbol in result.get("symbols", []):
+        size += len(symbol["name"]) + len(symbol["value"]) + _OBJECT_OVERHEAD
+    return size
+
+
+def _analysis_projection(include: Optional[List[str]]) -> Optional[Dict[str, FrozenSet[str]]]:
+    """Map each stage named in ``include`` to its selected fields; a bare stage name selects all of them."""
+    if include is None:
+        return None
+
+    projection: Dict[str, FrozenSet[str]] = {}
+    for selector in include:
+        stage, _, field = selector.partition(".")
+        fields = frozenset([field]) if field else frozenset(ANALYSIS_STAGE_FIELDS[stage])
+        projection[stage] = projection.get(stage, frozenset()) | fields
+    return projection
+
+
+def _includes(projection: Optional[Dict[str, FrozenSet[str]]], stage: str, field: Optional[str] = None) -> bool:
+    if projection is None:
+        return True
+    return stage in projection and (field is None or field in projection[stage])
+
+
+_ALWAYS_KEPT = ("error", "limit_exceeded")
+
+
+def _project_stage(stage: str, result: Any, projection: Optional[Dict[str, FrozenSet[str]]]) -> Any:
+    if projection is None or projection[stage] == frozenset(ANALYSIS_STAGE_FIELDS[stage]):
+        return result
+
+    fields = projection[stage]
+    # Errors and exceeded limits are kept whatever is selected: they are why other fields are missing.
+    if stage == "lexical":
+        return {key: value for key, value in result.items() if key in fields or key == "limit_exceeded"}
+    if stage == "syntactic":
+        return {name: {key: value for key, value in component.items() if key in fields or key in _ALWAYS_KEPT}
+                for name, component in result.items()}
+
+    projected = {}
+    if fields & {"errors", "symbols"}:
+        for name in ("header", "payload"):
+            projected[name] = {key: value for key, value in result[name].items() if key in fields}
+    if "metadata" in fields and "metadata" in result:
+        projected["metadata"] = result["metadata"]
+    return projected
+
+
+def _with_stage_errors(stage: str, projected: Any, result: Any) -> Any:
+    """Add to ``projected`` the errors in ``result`` that stopped the analysis at ``stage``."""
+    if stage == "lexical":
+        return {**projected, **{key: value for key, value in result.items() if key in ("errors", "limit_exceeded")}}
+
+    kept = ("errors",) if stage == "semantic" else _ALWAYS_KEPT
+    merged = dict(projected)
+    for name in ("header", "payload"):
+        merged[name] = {**projected.get(name, {}), **{key: value for key, value in result[name].items() if key in kept}}
+    return merged
@@ -0,0 +1,66 @@
+import hmac
+import json
+import os
+from typing import Dict, Mapping, Optional, Tuple
+
+from domain.signing_algorithm import SigningAlgorithm
+
+__all__ = ['Keyring', 'keyring', 'load_keyring_file']
+
+
+class Keyring:
+    """
+    HMAC keys preloaded under a key id, so a token can name its key in the
+    "kid" header instead of the request carrying the secret.
+
+    Only HMAC objects with the key already absorbed are kept, one per
+    algorithm; each signature starts from a ``copy()`` of one of them. The
+    secrets themselves are not stored.
+
+    Keys always verify signatures, but only sign tokens for requests without
+    a secret when ``signing`` is enabled; otherwise anyone could have the
+    build endpoints sign with them.
+    """
+
+    def __init__(self, keys: Optional[Mapping[str, str]] = None, signing: bool = False):
+        self._macs: Dict[Tuple[str, SigningAlgorithm], "hmac.HMAC"] = {}
+        self.signing = signing
+        if keys:
+            self.load(keys)
+
+    def load(self, keys: Mapping[str, str]) -> None:
+        """Replace every key in the keyring with ``keys``, mapping key ids to secrets."""
+        self._macs = {
+            (kid, alg): hmac.new(secret.encode(), digestmod=alg.get_hash_function())
+            for kid, secret in keys.items()
+            for alg in SigningAlgorithm
+        }
+
+    def __contains__(self, kid: object) -> bool:
+        return isinstance(kid, str) and (kid, SigningAlgorithm.HS256) in self._macs
+
+    def __bool__(self) -> bool:
+        return bool(self._macs)
+
+    def can_sign(self, kid: object) -> bool:
+        return self.signing and kid in self
+
+    def new_hmac(self, kid: str, alg: SigningAlgorithm) -> "hmac.HMAC":
+        """Return a fresh HMAC keyed with the ``kid`` key. Raises KeyError for an unknown ``kid``."""
+        return self._macs[(kid, alg)].copy()
+
+
+def load_keyring_file(path: str) -> Dict[str, str]:
+    """Read a JSON object mapping key ids to secrets of at least 8 characters."""
+    with open(path, encoding="utf-8") as file:
+        keys = json.load(file)
+
+    if not isinstance(keys, dict) or not all(isinstance(secret, str) and len(secret) >= 8 for secret in keys.values()):
+        raise RuntimeError(f"{path} must hold a JSON object mapping key ids to secrets of at least 8 characters.")
+    return keys
+
+
+keyring = Keyring(
+    load_keyring_file(os.environ["JWT_KEYRING_PATH"]) if os.getenv("JWT_KEYRING_PATH") else None,
+    signing=os.getenv("JWT_KEYRING_SIGNING", "false").strip().lower() in ("1", "true", "yes", "on")
+)
@@ -0,0 +1,235 @@
+"""
+Dictionary audit of the HMAC secret a token was signed with.
+
+    python -m services.secret_audit TOKEN WORDLIST [--max-candidates N] [--max-seconds S] [--workers W]
+
+Progress goes to stderr and the result, as JSON, to stdout. The exit status
+is 1 when the secret was found in the wordlist.
+"""
+import argparse
+import base64
+import binascii
+import hmac
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from domain.signing_algorithm import SigningAlgorithm
+from exceptions.service_exception import ServiceException
+from schemas.req_body import SECRET_AUDIT_MAX_CANDIDATES, SECRET_AUDIT_MAX_SECONDS
+from services.jwt_service import JwtService
+from type_defs.jwt_types import SecretAuditProgress, SecretAuditResult
+from utils.json import parse_json
+from utils.process_pool import get_process_pool
+
+__all__ = ['AuditTarget', 'audit_target', 'resolve_wordlist', 'iter_secret_audit']
+
+# Wordlists the endpoint may read; names given in requests are resolved inside this directory.
+_WORDLIST_DIR = os.getenv("SECRET_AUDIT_WORDLIST_DIR")
+# Processes the endpoint's audits share, so a request cannot take every core; the CLI defaults to all of them.
+_WORKERS = int(os.getenv("SECRET_AUDIT_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // 4)
+_CHUNK_SIZE = int(os.getenv("SECRET_AUDIT_CHUNK_SIZE", "4096"))
+_PROGRESS_INTERVAL = float(os.getenv("SECRET_AUDIT_PROGRESS_INTERVAL", "0.5"))
+
+
+@dataclass(frozen=True)
+class AuditTarget:
+    """What every candidate is checked against: the signed ``header.payload`` bytes and the raw signature."""
+    message: bytes
+    signature: bytes
+    alg: SigningAlgorithm
+
+
+def audit_target(token: str) -> AuditTarget:
+    """Raises a ``ServiceException`` when ``token`` is not an HMAC-signed JWT that can be audited."""
+    lexical_analysis = JwtService().lexical_analysis(token)
+    if lexical_analysis["errors"]:
+        raise _invalid_token(*lexical_analysis["errors"])
+
+    header = parse_json(lexical_analysis["decoded"]["header"]).parsed
+    alg = header.get("alg") if isinstance(header, dict) else None
+    try:
+        alg = SigningAlgorithm(alg)
+    except ValueError:
+        raise _invalid_token(f'El algoritmo "{alg}" no está soportado. Algoritmos válidos: '
+                             f'{", ".join(a.value for a in SigningAlgorithm)}.')
+
+    segments = lexical_analysis["segments"]
+    encoded_signature = segments["signature"]["value"]
+    try:
+        signature = base64.urlsafe_b64decode(encoded_signature + "=" * (-len(encoded_signature) % 4))
+    except binascii.Error:
+        signature = b""
+
+    # Anything else could never compare equal to the signatures check_signature computes.
+    if len(signature) != alg.get_hash_function()().digest_size or \
+            base64.urlsafe_b64encode(signature).rstrip(b"=").decode() != encoded_signature:
+        raise _invalid_token(f"La firma no es una firma {alg.value} válida.")
+
+    message = f"{segments['header']['value']}.{segments['payload']['value']}".encode()
+    return AuditTarget(message=message, signature=signature, alg=alg)
+
+
+def resolve_wordlist(name: str) -> Path:
+    """Find the wordlist ``name`` inside the configured directory, refusing paths that leave it."""
+    if not _WORDLIST_DIR:
+        raise ServiceException("La auditoría de secretos no está habilitada en este servidor.",
+                               HTTPStatus.SERVICE_UNAVAILABLE)
+
+    directory = Path(_WORDLIST_DIR).resolve()
+    path = (directory / name).resolve()
+    if not path.is_relative_to(directory) or not path.is_file():
+        raise ServiceException("Error de validación en el cuerpo de la solicitud", HTTPStatus.UNPROCESSABLE_ENTITY,
+                               {"wordlist": [f'No existe la lista de palabras "{name}".']})
+    return path
+
+
+def iter_secret_audit(target: AuditTarget, wordlist: Union[str, Path],
+                      max_candidates: int = SECRET_AUDIT_MAX_CANDIDATES,
+                      max_seconds: float = SECRET_AUDIT_MAX_SECONDS,
+                      workers: int = _WORKERS) -> Iterator[Union[SecretAuditProgress, SecretAuditResult]]:
+    """
+    Try each line of ``wordlist`` as the secret of ``target``, yielding a
+    progress record every ``SECRET_AUDIT_PROGRESS_INTERVAL`` seconds and a
+    result record last. The search stops at the first match, after
+    ``max_candidates`` candidates or once ``max_seconds`` have passed.
+
+    With more than one worker, chunks of candidates are checked in a process
+    pool, a few chunks ahead; on a match the chunks not started yet are
+    cancelled.
+    """
+    start = time.perf_counter()
+    last_progress = start
+    tested = 0
+    secret: Optional[bytes] = None
+    stop_reason = "exhausted"
+
+    with open(wordlist, "rb") as file:
+        lines = iter(file)
+        chunks = _iter_chunks(lines, max_candidates)
+        results = _check_chunks(target, chunks, workers) if workers > 1 else \
+            ((chunk, _find_secret((target.message, target.signature, target.alg, chunk))) for chunk in chunks)
+
+        try:
+            for chunk, index in results:
+                tested += len(chunk) if index is None else index + 1
+                now = time.perf_counter()
+
+                if index is not None:
+                    secret = chunk[index]
+                    stop_reason = "found"
+                    break
+                if now - start >= max_seconds:
+                    stop_reason = "time_budget"
+                    break
+                if now - last_progress >= _PROGRESS_INTERVAL:
+                    last_progress = now
+                    yield _progress("progress", tested, now - start)
+            else:
+                if tested >= max_candidates and any(line.rstrip(b"\r\n") for line in lines):
+                    stop_reason = "candidate_budget"
+        finally:
+            results.close()
+
+    result: SecretAuditResult = {**_progress("result", tested, time.perf_counter() - start),
+                                 "found": secret is not None, "stop_reason": stop_reason}
+    if secret is not None:
+        result["secret"] = secret.decode("utf-8", "replace")
+    yield result
+
+
+def _progress(event: str, tested: int, elapsed: float) -> SecretAuditProgress:
+    return {
+        "event": event,
+        "tested": tested,
+        "elapsed": round(elapsed, 3),
+        "candidates_per_second": round(tested / elapsed) if elapsed > 0 else 0
+    }
+
+
+def _iter_chunks(lines: Iterator[bytes], max_candidates: int) -> Iterator[List[bytes]]:
+    remaining = max_candidates
+    while remaining > 0:
+        chunk = []
+        for line in lines:
+            candidate = line.rstrip(b"\r\n")
+            if candidate:
+                chunk.append(candidate)
+                if len(chunk) == min(_CHUNK_SIZE, remaining):
+                    break
+
+        if not chunk:
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _check_chunks(target: AuditTarget, chunks: Iterable[List[bytes]],
+                  workers: int) -> Iterator[Tuple[List[bytes], Optional[int]]]:
+    """Yield ``(chunk, index of the match or None)`` in input order, keeping ``2 * workers`` chunks in flight."""
+    pool = get_process_pool("secret_audit", workers)
+    in_flight = deque()
+
+    try:
+        for chunk in chunks:
+            in_flight.append((chunk, pool.submit(_find_secret, (target.message, target.signature, target.alg, chunk))))
+            if len(in_flight) >= 2 * workers:
+                chunk, future = in_flight.popleft()
+                yield chunk, future.result()
+
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            yield chunk, future.result()
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+
+
+def _find_secret(job: Tuple[bytes, bytes, SigningAlgorithm, List[bytes]]) -> Optional[int]:
+    message, signature, alg, candidates = job
+    digest = alg.get_hash_function()
+
+    for index, candidate in enumerate(candidates):
+        if hmac.digest(candidate, message, digest) == signature:
+            return index
+    return None
+
+
+def _invalid_token(*messages: str) -> ServiceException:
+    return ServiceException("Error de validación en el cuerpo de la solicitud", HTTPStatus.UNPROCESSABLE_ENTITY,
+                            {"token": list(messages)})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.secret_audit",
+                                     description="Busca el secreto HMAC de un JWT en una lista de palabras.")
+    parser.add_argument("token")
+    parser.add_argument("wordlist", help="fichero con un secreto candidato por línea")
+    parser.add_argument("--max-candidates", type=int, default=SECRET_AUDIT_MAX_CANDIDATES)
+    parser.add_argument("--max-seconds", type=float, default=SECRET_AUDIT_MAX_SECONDS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    try:
+        target = audit_target(args.token)
+    except ServiceException as e:
+        parser.error("; ".join(e.get_errors()["token"]))
+
+    result = None
+    for record in iter_secret_audit(target, args.wordlist, args.max_candidates, args.max_seconds, args.workers):
+        if record["event"] == "progress":
+            print(f"{record['tested']} candidatos, {record['candidates_per_second']}/s", file=sys.stderr)
+        result = record
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 1 if result["found"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
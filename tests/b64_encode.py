@@ -2,6 +2,7 @@ import unittest
 import base64
 
 from turing_machine.b64_encode import b64_encode_tm
+from turing_machine.tape_io import BitTapeInput
 
 
 class Base64EncodeTest(unittest.TestCase):
@@ -12,9 +13,8 @@ class Base64EncodeTest(unittest.TestCase):
 
     def encode_with_turing_machine(self, input_string: str) -> str:
         data_bytes = input_string.encode('utf-8')
-        bits = ''.join(f'{byte:08b}' for byte in data_bytes)
 
-        result = b64_encode_tm.read_input(bits)
+        result = b64_encode_tm.read_input(BitTapeInput(data_bytes))
 
         b64_output = result.tape.get_symbols_as_str().replace("_", "")
         return b64_output
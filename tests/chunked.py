@@ -0,0 +1,47 @@
+import base64
+import random
+import unittest
+
+from turing_machine.chunked import encode_chunked
+from utils.process_pool import shutdown_process_pools
+
+
+class ChunkedEncodeTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_process_pools()
+
+    def test_matches_library_for_every_remainder(self):
+        rng = random.Random(42)
+
+        for length in range(0, 40):
+            data = bytes(rng.randrange(256) for _ in range(length))
+            with self.subTest(length=length):
+                self.assertEqual(encode_chunked(data), base64.b64encode(data))
+
+    def test_chunk_sizes(self):
+        data = "The quick brown fox jumps over the lazy dog".encode('utf-8')
+
+        for chunk_size in [1, 3, 4, 5, 12, 30, 100]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(encode_chunked(data, chunk_size=chunk_size), base64.b64encode(data))
+
+    def test_url_safe_machine(self):
+        data = bytes(range(256))
+
+        result = encode_chunked(data, machine="b64url_encode")
+
+        self.assertEqual(result, base64.urlsafe_b64encode(data).rstrip(b"="))
+
+    def test_parallel_encoding(self):
+        rng = random.Random(3)
+        data = bytes(rng.randrange(256) for _ in range(1001))
+
+        result = encode_chunked(data, parallel_threshold=100, max_workers=3)
+
+        self.assertEqual(result, base64.b64encode(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
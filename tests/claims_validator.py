@@ -0,0 +1,72 @@
+import random
+import threading
+import unittest
+
+from marshmallow import Schema, fields
+
+from schemas.claims_validator import compile_claims_validator
+from schemas.instances import get_schema
+from schemas.jwt_schemas import HeaderSchema, PayloadSchema
+
+_VALUES = [
+    None, True, False, 0, 1, -1, 1700000000, 10 ** 30, 0.0, 1.5, -2.5,
+    "", "x", "jwt", "JWT", "Jwt", "hs256", "HS256", "HS384", "HS512", "none",
+    [], [""], ["a"], ["a", "b"], ["a", 1], [None], {}, {"a": 1},
+]
+
+
+class ClaimsValidatorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.validators = {schema: compile_claims_validator(schema) for schema in (HeaderSchema, PayloadSchema)}
+
+    def assert_same_errors(self, schema_class, data):
+        expected = schema_class().validate(data)
+        actual = self.validators[schema_class](data)
+
+        self.assertEqual(list(actual.items()), list(expected.items()), repr(data))
+
+    def test_matches_marshmallow_on_each_claim(self):
+        for schema_class in (HeaderSchema, PayloadSchema):
+            for name in schema_class().fields:
+                for value in _VALUES:
+                    with self.subTest(schema=schema_class.__name__, name=name, value=value):
+                        self.assert_same_errors(schema_class, {name: value})
+
+    def test_matches_marshmallow_on_random_documents(self):
+        rng = random.Random(22)
+        claims = {
+            HeaderSchema: ["alg", "typ", "kid", "cty"],
+            PayloadSchema: ["iss", "sub", "aud", "exp", "nbf", "iat", "jti", "name", "roles"],
+        }
+
+        for _ in range(3000):
+            schema_class = rng.choice(list(claims))
+            names = rng.sample(claims[schema_class], rng.randrange(len(claims[schema_class]) + 1))
+            data = {name: rng.choice(_VALUES) for name in names}
+            with self.subTest(data=data):
+                self.assert_same_errors(schema_class, data)
+
+    def test_rejects_unsupported_schemas(self):
+        class StrictSchema(Schema):
+            name = fields.Str()
+
+        with self.assertRaises(ValueError):
+            compile_claims_validator(StrictSchema)
+
+
+class SchemaInstancesTest(unittest.TestCase):
+
+    def test_one_instance_per_thread(self):
+        instances = []
+        thread = threading.Thread(target=lambda: instances.append(get_schema(HeaderSchema)))
+        thread.start()
+        thread.join()
+
+        self.assertIs(get_schema(HeaderSchema), get_schema(HeaderSchema))
+        self.assertIsNot(instances[0], get_schema(HeaderSchema))
+
+
+if __name__ == '__main__':
+    unittest.main()
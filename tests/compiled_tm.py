@@ -0,0 +1,170 @@
+import base64
+import json
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from automata.base.exceptions import RejectionException
+
+from turing_machine.b64_encode import b64_encode_tm, b64_encode_compiled_tm, config_path
+from turing_machine.loader import load_compiled_tm, get_tm, get_compiled_tm
+from turing_machine.tape_io import BitTapeInput, SymbolSink
+
+
+class CompiledTuringMachineTest(unittest.TestCase):
+
+    def to_bits(self, data: bytes) -> str:
+        return ''.join(f'{byte:08b}' for byte in data)
+
+    def assert_same_run(self, data: bytes):
+        bits = self.to_bits(data)
+
+        expected = b64_encode_tm.read_input(bits)
+        result = b64_encode_compiled_tm.read_input(bits)
+
+        self.assertEqual(result.tape, expected.tape.get_symbols_as_str(), f"Tape mismatch for {data!r}")
+        self.assertEqual(result.position, expected.tape.current_position, f"Position mismatch for {data!r}")
+        self.assertEqual(result.state, expected.state, f"State mismatch for {data!r}")
+
+        macro_result = b64_encode_compiled_tm.read_input_macro(bits)
+        self.assertEqual(macro_result.tape, result.tape, f"Macro tape mismatch for {data!r}")
+        self.assertEqual(macro_result.position, result.position, f"Macro position mismatch for {data!r}")
+        self.assertEqual(macro_result.state, result.state, f"Macro state mismatch for {data!r}")
+        self.assertEqual(macro_result.steps, result.steps, f"Macro step count mismatch for {data!r}")
+
+    def test_empty_input(self):
+        self.assert_same_run(b"")
+
+    def test_every_single_byte(self):
+        for byte in range(256):
+            with self.subTest(byte=byte):
+                self.assert_same_run(bytes([byte]))
+
+    def test_padding_lengths(self):
+        for input_string in ["M", "Ma", "Man", "Man!", "hello", '{"alg":"HS256","typ":"JWT"}']:
+            with self.subTest(input=input_string):
+                self.assert_same_run(input_string.encode('utf-8'))
+
+    def test_random_inputs(self):
+        rng = random.Random(1234)
+
+        for length in range(1, 40):
+            data = bytes(rng.randrange(256) for _ in range(length))
+            with self.subTest(length=length):
+                self.assert_same_run(data)
+
+    def test_step_count_matches_dtm(self):
+        bits = self.to_bits(b"hello")
+        dtm_steps = sum(1 for _ in b64_encode_tm.read_input_stepwise(bits)) - 1
+
+        self.assertEqual(b64_encode_compiled_tm.read_input(bits).steps, dtm_steps)
+
+    def test_macro_steps_with_other_block_sizes(self):
+        rng = random.Random(99)
+        data = bytes(rng.randrange(256) for _ in range(150))
+        bits = self.to_bits(data)
+        expected = b64_encode_compiled_tm.read_input(bits)
+
+        for block_size in [1, 5, 6, 24, 64]:
+            with self.subTest(block_size=block_size):
+                machine = load_compiled_tm(str(config_path), block_size=block_size)
+                result = machine.read_input_macro(bits)
+
+                self.assertEqual(result.tape, expected.tape)
+                self.assertEqual(result.position, expected.position)
+                self.assertEqual(result.steps, expected.steps)
+
+    def test_macro_steps_reduce_step_count(self):
+        bits = self.to_bits(b"The quick brown fox jumps over the lazy dog" * 3)
+        result = b64_encode_compiled_tm.read_input_macro(bits)
+
+        self.assertLess(result.macro_steps * 10, result.steps)
+
+    def test_bytes_input_matches_bit_string(self):
+        rng = random.Random(7)
+
+        for length in [0, 1, 2, 3, 10, 64, 65, 130]:
+            data = bytes(rng.randrange(256) for _ in range(length))
+            bits = self.to_bits(data)
+
+            with self.subTest(length=length):
+                self.assertEqual(list(BitTapeInput(data)), list(bits))
+                self.assertEqual(b64_encode_compiled_tm.read_input(BitTapeInput(data)),
+                                 b64_encode_compiled_tm.read_input(bits))
+                self.assertEqual(b64_encode_compiled_tm.read_input_macro(BitTapeInput(data, chunk_size=5)),
+                                 b64_encode_compiled_tm.read_input_macro(bits))
+
+    def test_sink_collects_encoded_symbols(self):
+        data = b"Turing Machine Test"
+
+        for run in [b64_encode_compiled_tm.read_input, b64_encode_compiled_tm.read_input_macro]:
+            with self.subTest(mode=run.__name__):
+                sink = SymbolSink()
+                result = run(BitTapeInput(memoryview(data)), sink=sink)
+
+                self.assertIsNone(result.tape)
+                self.assertEqual(sink.getvalue(), base64.b64encode(data).decode('ascii'))
+
+    def test_url_safe_machine(self):
+        rng = random.Random(11)
+        dtm = get_tm("b64url_encode")
+        compiled_tm = get_compiled_tm("b64url_encode")
+
+        for length in range(0, 25):
+            data = bytes(rng.randrange(256) for _ in range(length))
+            expected = base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+            with self.subTest(length=length):
+                dtm_result = dtm.read_input(BitTapeInput(data))
+                result = compiled_tm.read_input(BitTapeInput(data))
+
+                self.assertEqual(result.tape, dtm_result.tape.get_symbols_as_str())
+                self.assertEqual(result.tape.replace(compiled_tm.blank_symbol, ""), expected)
+                self.assertEqual(compiled_tm.read_input_macro(BitTapeInput(data)).tape, result.tape)
+
+    def test_compiled_artifact_is_reused(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / config_path.name
+            shutil.copy(config_path, path)
+            bits = self.to_bits(b"hello")
+
+            cold = load_compiled_tm(str(path))
+            artifacts = list(path.parent.glob("*.tmcache"))
+            cached = load_compiled_tm(str(path))
+
+            self.assertEqual(len(artifacts), 1)
+            self.assertEqual(cached.to_tables(), cold.to_tables())
+            self.assertEqual(cached.read_input(bits), b64_encode_compiled_tm.read_input(bits))
+
+            path.write_text(path.read_text() + "\n")
+            load_compiled_tm(str(path))
+
+            self.assertEqual(len(list(path.parent.glob("*.tmcache"))), 2)
+
+    def test_invalid_artifact_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / config_path.name
+            shutil.copy(config_path, path)
+            expected = load_compiled_tm(str(path)).to_tables()
+            artifact = next(path.parent.glob("*.tmcache"))
+            content = artifact.read_bytes()
+            header = json.loads(content.split(b"\n", 1)[0])
+
+            out_of_range = bytearray(content)
+            out_of_range[-1] = 3
+            bad_blank = json.dumps(dict(header, blank=len(header["symbols"]))).encode() + content[content.index(b"\n"):]
+            for data in (pickle.dumps(expected), content[:-1], bytes(out_of_range), bad_blank):
+                with self.subTest(data=data[:20]):
+                    artifact.write_bytes(data)
+                    self.assertEqual(load_compiled_tm(str(path)).to_tables(), expected)
+
+    def test_rejects_symbols_outside_alphabet(self):
+        with self.assertRaises(RejectionException):
+            b64_encode_compiled_tm.read_input("0120")
+
+
+if __name__ == '__main__':
+    unittest.main()
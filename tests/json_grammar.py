@@ -0,0 +1,188 @@
+import json
+import random
+import runpy
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from lark import Lark
+
+from utils.json import json_grammar, json_grammar_tables
+from utils.json.json_grammar import analyze_json_grammar, _parser, _production, _iter_preorder, _trace_derivation, \
+    _format_tree, _EPSILON
+
+
+def reference_derivation(tree):
+    """The original list-rebuilding tracer, kept as the expected output."""
+    steps = []
+    current_string = [tree.data]
+
+    for node in _iter_preorder([tree]):
+        prod = _production(node)
+        new_string = []
+        replaced = False
+
+        for symbol in current_string:
+            if symbol == prod.source and not replaced:
+                if prod.target != _EPSILON:
+                    new_string.extend(prod.target.split())
+                replaced = True
+            else:
+                new_string.append(symbol)
+
+        current_string = new_string
+        steps.append((prod, " ".join(current_string)))
+
+    return steps
+
+
+class DerivationTracerTest(unittest.TestCase):
+
+    def assert_same_derivation(self, json_string: str):
+        tree = _parser.parse(json_string)
+        steps = [(step.production, step.result) for step in _trace_derivation(tree)]
+
+        self.assertEqual(steps, reference_derivation(tree), json_string)
+
+    def test_token_header(self):
+        self.assert_same_derivation('{"alg":"HS256","typ":"JWT"}')
+
+    def test_empty_containers(self):
+        self.assert_same_derivation('{}')
+        self.assert_same_derivation('{"a": [], "b": {}}')
+
+    def test_terminals_that_spell_rule_names(self):
+        self.assert_same_derivation('{"a": null, "b": [null, null], "c": null}')
+        self.assert_same_derivation('{"note": "a string value", "n": 1, "s": "x"}')
+        self.assert_same_derivation('{"k null": "value pair", "v": [true, "key", null]}')
+
+    def test_random_documents(self):
+        rng = random.Random(2024)
+        words = ["null", "value", "string", "pair", "key", "members", "x", "a b", "true"]
+
+        def random_value(depth):
+            choice = rng.random()
+            if depth > 3 or choice < 0.4:
+                return rng.choice([None, True, False, 7, -1.5, rng.choice(words),
+                                   " ".join(rng.choice(words) for _ in range(3))])
+            if choice < 0.7:
+                return [random_value(depth + 1) for _ in range(rng.randrange(4))]
+            return {f"{rng.choice(words)}{i}": random_value(depth + 1) for i in range(rng.randrange(4))}
+
+        for i in range(300):
+            document = {f"claim {i} {j}": random_value(0) for j in range(rng.randrange(5))}
+            with self.subTest(document=document):
+                self.assert_same_derivation(json.dumps(document, indent=rng.choice([None, 2])))
+
+    def test_delta_format_expands_to_full_steps(self):
+        documents = [
+            '{}',
+            '{"alg":"HS256","typ":"JWT"}',
+            '{"a": null, "b": [null, {"c": []}], "note": "a string value", "s": "x"}',
+        ]
+
+        for document in documents:
+            with self.subTest(document=document):
+                delta = analyze_json_grammar(document, derivation_format="delta")
+
+                self.assertEqual(delta.start, "object")
+                self.assertEqual(delta.expand(), analyze_json_grammar(document))
+
+    def test_delta_step_records_the_edit(self):
+        steps = analyze_json_grammar('{"a": true}', derivation_format="delta").steps
+
+        self.assertEqual((steps[0].position, steps[0].replacement), (0, ["{", "members_opt", "}"]))
+        self.assertEqual((steps[1].position, steps[1].replacement), (1, ["members"]))
+
+
+
+class ParseTreeRenderTest(unittest.TestCase):
+
+    def test_renders_box_drawing_tree(self):
+        expected = "\n".join([
+            'object',
+            '├── {',
+            '├── members_opt',
+            '│   └── members',
+            '│       ├── pair',
+            '│       │   ├── key',
+            '│       │   │   └── "a"',
+            '│       │   ├── :',
+            '│       │   └── value',
+            '│       │       └── array',
+            '│       │           ├── [',
+            '│       │           ├── elements_opt',
+            '│       │           │   └── elements',
+            '│       │           │       └── value',
+            '│       │           │           └── number',
+            '│       │           │               └── 1',
+            '│       │           └── ]',
+            '│       ├── ,',
+            '│       └── members',
+            '│           └── pair',
+            '│               ├── key',
+            '│               │   └── "b"',
+            '│               ├── :',
+            '│               └── value',
+            '│                   └── object',
+            '│                       ├── {',
+            '│                       ├── members_opt',
+            '│                       └── }',
+            '└── }',
+        ])
+
+        self.assertEqual(_format_tree(_parser.parse('{"a": [1], "b": {}}')), expected)
+
+    def test_renders_deeply_nested_objects(self):
+        depth = 1500
+        lines = _format_tree(_parser.parse("{" + '"a": {' * depth + "}" * (depth + 1))).split("\n")
+
+        self.assertEqual(lines[0], "object")
+        self.assertEqual(lines[-1], "└── }")
+        self.assertEqual(sum(1 for line in lines if line.endswith("── object")), depth)
+
+    def test_counts_steps_and_lines(self):
+        tree = _parser.parse('{"a": [1, true], "b": {"c": null}}')
+        rules, tokens = json_grammar.count_tree_nodes(tree)
+
+        self.assertEqual(rules, len(_trace_derivation(tree)))
+        self.assertEqual(rules + tokens, len(_format_tree(tree).split("\n")))
+        self.assertEqual(json_grammar.analyze_json_tree(tree, max_steps=4).steps, _trace_derivation(tree)[:4])
+
+
+class ParserTablesTest(unittest.TestCase):
+
+    def test_tables_match_grammar(self):
+        self.assertEqual(json_grammar_tables.GRAMMAR_SHA256, json_grammar.grammar_hash(),
+                         "Regenerate utils/json/json_grammar_tables.py with write_parser_tables()")
+
+    def test_parser_from_tables_matches_fresh_build(self):
+        fresh = Lark(json_grammar._JSON_GRAMMAR, start="object", parser="lalr",
+                     transformer=json_grammar._JsonValueBuilder())
+        document = '{"a": [1, "x", null, -2.5e3], "b": {"c": true, "d": {}}}'
+
+        self.assertEqual(_parser.parse(document), fresh.parse(document))
+        self.assertEqual(_parser.parse(document).value, json.loads(document))
+
+    def test_stale_tables_are_not_used(self):
+        with mock.patch.object(json_grammar_tables, "GRAMMAR_SHA256", "0" * 64), \
+                mock.patch.object(Lark, "_load_from_dict") as load:
+            parser = json_grammar._load_parser()
+
+        load.assert_not_called()
+        self.assertEqual(parser.parse('{"a": 1}').value, {"a": 1})
+
+    def test_written_tables_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "tables.py"
+            json_grammar.write_parser_tables(path)
+            namespace = runpy.run_path(str(path))
+
+        parser = Lark._load_from_dict(namespace["DATA"], namespace["MEMO"], transformer=json_grammar._JsonValueBuilder())
+        self.assertEqual(namespace["GRAMMAR_SHA256"], json_grammar.grammar_hash())
+        self.assertEqual(parser.parse('{"a": [true]}').value, {"a": [True]})
+
+
+if __name__ == '__main__':
+    unittest.main()
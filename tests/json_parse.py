@@ -0,0 +1,85 @@
+import json
+import random
+import unittest
+
+from utils.json.json_parse import parse_json, parse_json_tree, json_nesting_depth
+
+
+class SinglePassJsonParseTest(unittest.TestCase):
+
+    documents = [
+        '{"alg":"HS256","typ":"JWT"}',
+        '{"a": [1, 2.5e3, -0, 1E2, true, false, null], "b": {"c": "x\\u00e9\\n\\"", "d": []}}',
+        '{"dup": 1, "other": 2, "dup": 3}',
+        '{"n": 01}',
+        '{"n": +1}',
+        '{"n": 1.}',
+        '{"n": .5}',
+        '{"s": "a\\qb"}',
+        '{"s": "tab\there"}',
+        '{"a": 1}\f',
+        '{"a": 1,}',
+        '{"a" 1}',
+        '{a: 1}',
+        '{"a": 1} x',
+        '[1, 2]',
+        '"text"',
+        '',
+    ]
+
+    def assert_same_as_json_module(self, text: str):
+        result, tree = parse_json_tree(text)
+
+        self.assertEqual(result, parse_json(text), repr(text))
+        self.assertEqual(tree is not None, result.valid and isinstance(result.parsed, dict), repr(text))
+        if tree is not None:
+            self.assertEqual(list(result.parsed), list(json.loads(text)))
+
+    def test_matches_json_module(self):
+        for document in self.documents:
+            with self.subTest(document=document):
+                self.assert_same_as_json_module(document)
+
+    def test_matches_json_module_on_mutations(self):
+        rng = random.Random(12)
+        symbols = '{}[]:,"\\ a1e.-+tnf\t\n\r0'
+
+        for _ in range(2000):
+            text = list(rng.choice(self.documents[:3]))
+            for _ in range(rng.randrange(1, 3)):
+                position = rng.randrange(len(text))
+                if rng.random() < 0.5:
+                    text.insert(position, rng.choice(symbols))
+                else:
+                    text[position] = rng.choice(symbols)
+
+            text = "".join(text)
+            if "NaN" in text or "Infinity" in text:
+                continue
+            with self.subTest(text=text):
+                self.assert_same_as_json_module(text)
+
+    def test_value_is_built_with_tree(self):
+        result, tree = parse_json_tree('{"sub": "1", "roles": ["a", "b"], "exp": 1.5}')
+
+        self.assertEqual(tree.data, "object")
+        self.assertIs(tree.value, result.parsed)
+        self.assertEqual(result.parsed, {"sub": "1", "roles": ["a", "b"], "exp": 1.5})
+
+    def test_rejects_values_outside_grammar(self):
+        result, tree = parse_json_tree('{"a": NaN}')
+
+        self.assertFalse(result.valid)
+        self.assertIsNone(tree)
+        self.assertEqual((result.error.line, result.error.column, result.error.position), (1, 7, 6))
+        self.assertEqual(result.error.message, "Valor no permitido por la gramática JSON")
+
+    def test_nesting_depth(self):
+        self.assertEqual(json_nesting_depth('{"a": [1, {"b": "[[{"}], "c": {}}'), 3)
+        self.assertEqual(json_nesting_depth('{"a": "\\"[["}'), 1)
+        self.assertEqual(json_nesting_depth('"x"'), 0)
+        self.assertEqual(json_nesting_depth("[" * 1000, limit=10), 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
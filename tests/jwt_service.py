@@ -0,0 +1,404 @@
+import random
+import re
+import unittest
+from unittest import mock
+
+from services import jwt_service
+from services.jwt_service import JwtService, segment_cache, analysis_cache
+from utils.base64 import encode_base64_url, decode_base64_url
+from utils.process_pool import shutdown_process_pools
+
+
+class SegmentCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        segment_cache.clear()
+        analysis_cache.clear()
+        self.service = JwtService()
+        self.token = self.service.build_token(
+            {"alg": "HS256", "typ": "JWT"},
+            {"sub": "user", "exp": 2000000000, "roles": ["a", "b"]},
+            "12345678"
+        )["token"]
+
+    def test_segments_are_reused_across_tokens(self):
+        first = self.service.analyze_token(self.token, "12345678")
+        hits = segment_cache.stats()["hits"]
+        second = self.service.analyze_token(self.token, "other-secret")
+
+        self.assertEqual(second["syntactic"], first["syntactic"])
+        self.assertEqual(second["semantic"], first["semantic"])
+        self.assertNotEqual(second["cryptographic"], first["cryptographic"])
+        self.assertEqual(segment_cache.stats()["hits"], hits + 4)
+
+    def test_repeated_analysis_is_served_from_token_cache(self):
+        first = self.service.analyze_token(self.token, "12345678")
+        second = self.service.analyze_token(self.token, "12345678")
+
+        self.assertEqual(second, first)
+        self.assertEqual(analysis_cache.stats()["hits"], 1)
+        self.assertTrue(all(secret not in repr(key) for key in analysis_cache._entries for secret in ["12345678"]))
+
+    def test_token_cache_entry_ends_at_exp(self):
+        with mock.patch("time.time", return_value=1999999000):
+            self.service.analyze_token(self.token, None)
+            self.assertEqual(analysis_cache.stats()["hits"], 0)
+            self.service.analyze_token(self.token, None)
+            self.assertEqual(analysis_cache.stats()["hits"], 1)
+
+        with mock.patch("time.time", return_value=2000000000):
+            self.service.analyze_token(self.token, None)
+
+        self.assertEqual(analysis_cache.stats()["expirations"], 1)
+
+    def test_expiration_is_computed_on_every_call(self):
+        with mock.patch("services.jwt_service.time.time", return_value=1999999999):
+            before = self.service.analyze_token(self.token, None)
+        with mock.patch("services.jwt_service.time.time", return_value=2000000000):
+            after = self.service.analyze_token(self.token, None)
+
+        self.assertFalse(before["semantic"]["metadata"]["expired"])
+        self.assertTrue(after["semantic"]["metadata"]["expired"])
+        self.assertIs(after["semantic"]["payload"], before["semantic"]["payload"])
+
+
+def reference_lexical_analysis(token):
+    """The split-and-match lexer the fused scanner replaced, kept as the expected output."""
+    errors = []
+    parts = token.split('.')
+    if len(parts) != 3:
+        return {"errors": ["El token debe contener exactamente tres segmentos separados por puntos"]}
+
+    segments = {}
+    start = 0
+    for name, part in zip(("header", "payload", "signature"), parts):
+        segments[name] = {"value": part, "start": start, "end": start + len(part)}
+        start += len(part) + 1
+
+    pattern = re.compile(r'^[A-Za-z0-9_-]+$')
+    for name, first in (("header", "E"), ("payload", "e"), ("signature", "E")):
+        if not pattern.match(segments[name]["value"]):
+            errors.append(f"{first}l segmento {name} no es una cadena codificada en base64url")
+    if errors:
+        return {"segments": segments, "errors": errors}
+
+    decoded = {}
+    for name in ("header", "payload"):
+        try:
+            decoded[name] = decode_base64_url(segments[name]["value"])
+        except ValueError:
+            errors.append(f"El segmento {name} no contiene texto UTF-8 válido. "
+                          "El token puede estar corrupto o no ser un JWT estándar.")
+    if errors:
+        return {"errors": errors}
+
+    return {"errors": errors, "segments": segments, "decoded": decoded}
+
+
+class LexicalAnalysisTest(unittest.TestCase):
+
+    def test_matches_reference_lexer(self):
+        service = JwtService()
+        rng = random.Random(23)
+        valid = service.build_token({"alg": "HS256", "typ": "JWT"}, {"sub": "ñandú", "n": 1}, "12345678")["token"]
+        tokens = [valid, "", ".", "..", "a.b.c", "a..c", "YQ.YWI.x", "Y.YQ.x", "YR.YQ.x", "YQ\n.YQ.x", "YWJj\n.YQ.x",
+                  "YQ.YQ.x\n", "YQ=.YQ.x", "4pyT.YQ.x", "_w.YQ.x", "é.YQ.x", "a.b.c.d"]
+
+        symbols = "AQYWJj-_4pyTw.=+/\né"
+        for _ in range(3000):
+            token = list(valid if rng.random() < 0.3 else "".join(rng.choice(symbols) for _ in range(rng.randrange(12))))
+            for _ in range(rng.randrange(3)):
+                if token:
+                    token[rng.randrange(len(token))] = rng.choice(symbols)
+            tokens.append("".join(token))
+
+        for token in tokens:
+            with self.subTest(token=token):
+                self.assertEqual(service.lexical_analysis(token), reference_lexical_analysis(token))
+
+
+class AnalyzeProjectionTest(unittest.TestCase):
+
+    def setUp(self):
+        segment_cache.clear()
+        analysis_cache.clear()
+        self.service = JwtService()
+        self.token = self.service.build_token(
+            {"alg": "HS256", "typ": "JWT"}, {"sub": "user", "exp": 2000000000}, "12345678"
+        )["token"]
+
+    def test_selected_fields_match_full_analysis(self):
+        full = self.service.analyze_token(self.token, "12345678")
+        analysis_cache.clear()
+        segment_cache.clear()
+
+        with mock.patch.object(jwt_service, "analyze_json_tree") as derivation, \
+                mock.patch.object(jwt_service, "build_symbol_table") as symbols:
+            projected = self.service.analyze_token(
+                self.token, "12345678", include=["lexical", "semantic.errors", "semantic.metadata", "cryptographic"]
+            )
+
+        derivation.assert_not_called()
+        symbols.assert_not_called()
+        self.assertEqual(projected, {
+            "lexical": full["lexical"],
+            "semantic": {
+                "header": {"errors": full["semantic"]["header"]["errors"]},
+                "payload": {"errors": full["semantic"]["payload"]["errors"]},
+                "metadata": full["semantic"]["metadata"],
+            },
+            "cryptographic": True,
+        })
+
+    def test_signature_alone_still_checks_the_header(self):
+        token = ".".join(encode_base64_url(part) for part in ['{"alg": "none"}', '{"sub": "user"}', "sig"])
+
+        self.assertEqual(self.service.analyze_token(self.token, "12345678", include=["cryptographic"]),
+                         {"cryptographic": True})
+        full = self.service.analyze_token(token, "12345678")
+        self.assertNotIn("cryptographic", full)
+        self.assertEqual(self.service.analyze_token(token, "12345678", include=["cryptographic"]), {
+            "semantic": {
+                "header": {"errors": full["semantic"]["header"]["errors"]},
+                "payload": {"errors": full["semantic"]["payload"]["errors"]},
+            }
+        })
+        self.assertIn("alg", full["semantic"]["header"]["errors"])
+
+    def test_stage_that_stopped_the_analysis_reports_its_errors(self):
+        malformed = self.token.rsplit(".", 1)[0]
+        unparsable = ".".join(encode_base64_url(part) for part in ['{"alg": "HS256"', '{"sub": "user"}', "sig"])
+
+        lexical = self.service.analyze_token(malformed, "12345678", include=["cryptographic"])
+        self.assertEqual(lexical, {"lexical": {"errors": self.service.lexical_analysis(malformed)["errors"]}})
+        self.assertTrue(lexical["lexical"]["errors"])
+
+        syntactic = self.service.analyze_token(unparsable, "12345678", include=["semantic.symbols", "cryptographic"])
+        self.assertEqual(list(syntactic), ["syntactic"])
+        self.assertIn("error", syntactic["syntactic"]["header"])
+        self.assertEqual(syntactic["syntactic"]["payload"], {})
+
+        # Without a secret the token is valid but its signature is not checked.
+        self.assertEqual(self.service.analyze_token(self.token, None, include=["cryptographic"]),
+                         {"semantic": {"header": {"errors": {}}, "payload": {"errors": {}}}})
+        self.assertEqual(self.service.analyze_token(self.token, None, include=["lexical.segments"]),
+                         {"lexical": {"segments": self.service.lexical_analysis(self.token)["segments"]}})
+
+    def test_parse_errors_are_kept_without_derivation(self):
+        token = ".".join(encode_base64_url(part) for part in ['{"alg": "HS256"}', '{"n": NaN}', "sig"])
+
+        full = self.service.analyze_token(token, None)
+        projected = self.service.analyze_token(token, None, include=["syntactic.parsed"])
+
+        self.assertEqual(projected["syntactic"]["payload"], full["syntactic"]["payload"])
+        self.assertEqual(projected["syntactic"]["header"], {"parsed": {"alg": "HS256"}})
+
+    def test_projection_is_part_of_the_cache_key(self):
+        self.service.analyze_token(self.token, None, include=["lexical"])
+
+        self.assertIn("syntactic", self.service.analyze_token(self.token, None))
+        self.assertEqual(analysis_cache.stats()["hits"], 0)
+
+
+class AnalysisBudgetTest(unittest.TestCase):
+
+    def setUp(self):
+        segment_cache.clear()
+        analysis_cache.clear()
+        self.service = JwtService()
+
+    def tearDown(self):
+        segment_cache.clear()
+        analysis_cache.clear()
+
+    def token(self, payload: str) -> str:
+        return ".".join(encode_base64_url(part) for part in ['{"alg":"HS256","typ":"JWT"}', payload, "sig"])
+
+    def test_long_token_stops_lexical_analysis(self):
+        with mock.patch.object(jwt_service, "_MAX_TOKEN_LENGTH", 20):
+            result = self.service.analyze_token(self.token('{"a":1}'), None)
+
+        self.assertEqual(list(result), ["lexical"])
+        self.assertEqual(result["lexical"]["limit_exceeded"], {"limit": "token_length", "max": 20})
+
+    def test_large_segment_is_not_decoded(self):
+        with mock.patch.object(jwt_service, "_MAX_SEGMENT_BYTES", 30), \
+                mock.patch.object(jwt_service, "decode_base64_url") as decode:
+            result = self.service.analyze_token(self.token('{"sub":"%s"}' % ("x" * 30)), None)
+
+        decode.assert_not_called()
+        self.assertEqual(result["lexical"]["limit_exceeded"], {"limit": "segment_size", "max": 30, "segment": "payload"})
+        self.assertEqual(len(result["lexical"]["errors"]), 1)
+
+    def test_deep_json_is_not_parsed(self):
+        payload = '{"a":' * 5 + '"[[[[["' + '}' * 5
+        with mock.patch.object(jwt_service, "_MAX_JSON_DEPTH", 5):
+            self.assertNotIn("limit_exceeded", self.service.analyze_token(self.token(payload), None)["syntactic"]["payload"])
+        segment_cache.clear()
+        analysis_cache.clear()
+
+        with mock.patch.object(jwt_service, "_MAX_JSON_DEPTH", 4), \
+                mock.patch.object(jwt_service, "parse_json_tree", wraps=jwt_service.parse_json_tree) as parse:
+            result = self.service.analyze_token(self.token(payload), None)
+
+        parse.assert_called_once_with(text='{"alg":"HS256","typ":"JWT"}')
+        self.assertEqual(result["syntactic"]["payload"]["limit_exceeded"], {"limit": "json_depth", "max": 4})
+        self.assertIn("message", result["syntactic"]["payload"]["error"])
+        self.assertNotIn("semantic", result)
+
+    def test_wide_json_skips_derivation_but_keeps_parsed_value(self):
+        with mock.patch.object(jwt_service, "_MAX_TREE_NODES", 30):
+            result = self.service.analyze_token(self.token('{"a":[1,2,3,4,5,6]}'), None)
+
+        self.assertEqual(result["syntactic"]["payload"], {
+            "parsed": {"a": [1, 2, 3, 4, 5, 6]},
+            "limit_exceeded": {"limit": "tree_nodes", "max": 30}
+        })
+        self.assertIn("derivation", result["syntactic"]["header"])
+        self.assertIn("semantic", result)
+
+    def test_derivation_is_truncated(self):
+        full = self.service.analyze_token(self.token('{"a":[1,2,3]}'), None)["syntactic"]["payload"]
+        segment_cache.clear()
+        analysis_cache.clear()
+
+        with mock.patch.object(jwt_service, "_MAX_DERIVATION_STEPS", len(full["derivation"].steps)):
+            exact = self.service.analyze_token(self.token('{"a":[1,2,3]}'), None)["syntactic"]["payload"]
+        segment_cache.clear()
+        analysis_cache.clear()
+        with mock.patch.object(jwt_service, "_MAX_DERIVATION_STEPS", 5):
+            truncated = self.service.analyze_token(self.token('{"a":[1,2,3]}'), None)["syntactic"]["payload"]
+
+        self.assertEqual(exact, full)
+        self.assertEqual(truncated["derivation"].steps, full["derivation"].steps[:5])
+        self.assertEqual(truncated["derivation"].tree, full["derivation"].tree)
+        self.assertEqual(truncated["limit_exceeded"], {"limit": "derivation_steps", "max": 5})
+
+
+class AnalyzeBatchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = JwtService()
+        cls.tokens = [
+            cls.service.build_token({"alg": "HS256", "typ": "JWT"}, {"sub": f"user-{i}"}, "12345678")["token"]
+            for i in range(6)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_process_pools()
+
+    def test_results_keep_input_order_with_item_errors(self):
+        items = [
+            {"token": self.tokens[0], "secret": "12345678"},
+            {"secret": "12345678"},
+            "not an object",
+            {"token": self.tokens[1], "derivation_format": "delta"},
+            {"token": "a.b"},
+        ]
+
+        results = self.service.analyze_token_batch(items)
+
+        self.assertEqual([entry["index"] for entry in results], list(range(len(items))))
+        self.assertEqual(results[0]["result"], self.service.analyze_token(self.tokens[0], "12345678"))
+        self.assertIn("token", results[1]["error"]["details"])
+        self.assertIn("error", results[2])
+        self.assertEqual(results[3]["result"]["syntactic"]["header"]["derivation"].start, "object")
+        self.assertTrue(results[4]["result"]["lexical"]["errors"])
+
+    def test_failed_analysis_is_reported_per_item(self):
+        with mock.patch.object(JwtService, "lexical_analysis", side_effect=[RuntimeError("boom"), {"errors": ["x"]}]):
+            analysis_cache.clear()
+            results = self.service.analyze_token_batch([{"token": "t1"}, {"token": "t2"}])
+
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1]["result"], {"lexical": {"errors": ["x"]}})
+
+    def test_parallel_batch_matches_serial(self):
+        items = [{"token": token, "secret": secret} for token in self.tokens for secret in ["12345678", "wrong"]]
+
+        with mock.patch.object(jwt_service, "_BATCH_PARALLEL_MIN_ITEMS", 1), \
+                mock.patch.object(jwt_service, "_BATCH_MAX_WORKERS", 2):
+            parallel = self.service.analyze_token_batch(items, parallel=True)
+
+        self.assertEqual(parallel, self.service.analyze_token_batch(items))
+
+    def test_stage_stream_matches_batch_results(self):
+        items = [{"token": self.tokens[0], "secret": "12345678"}, {"secret": "x"}, {"token": "a.b"}]
+        results = self.service.analyze_token_batch(items)
+
+        for parallel in [False, True]:
+            with self.subTest(parallel=parallel), \
+                    mock.patch.object(jwt_service, "_BATCH_PARALLEL_MIN_ITEMS", 1), \
+                    mock.patch.object(jwt_service, "_BATCH_MAX_WORKERS", 2):
+                records = list(self.service.iter_token_batch_stages(items, parallel=parallel))
+
+                self.assertEqual([(r["index"], r.get("stage")) for r in records], [
+                    (0, "lexical"), (0, "syntactic"), (0, "semantic"), (0, "cryptographic"), (1, None), (2, "lexical")
+                ])
+                self.assertEqual({r["stage"]: r["data"] for r in records if r["index"] == 0}, results[0]["result"])
+                self.assertEqual(records[4], results[1])
+
+    def test_token_stages_are_streamed_in_order(self):
+        analysis_cache.clear()
+        stages = self.service.iter_token_analysis(self.tokens[0], "12345678")
+
+        self.assertEqual(next(stages)[0], "lexical")
+        self.assertEqual(analysis_cache.stats()["entries"], 0)
+        self.assertEqual([stage for stage, _ in stages], ["syntactic", "semantic", "cryptographic"])
+        self.assertEqual(analysis_cache.stats()["entries"], 1)
+
+
+class BuildBatchTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_process_pools()
+
+    def setUp(self):
+        self.service = JwtService()
+        header = {"alg": "HS256", "typ": "JWT"}
+        self.items = [
+            {"header": header, "payload": {"sub": f"user-{i}"}, "secret": f"secret-{i % 3:03d}"}
+            for i in range(8)
+        ]
+        self.items.append({"header": {"alg": "HS384", "typ": "JWT"}, "payload": {"sub": "x"}, "secret": "12345678"})
+
+    def expected(self, item):
+        return self.service.build_token(item["header"], item["payload"], item["secret"])
+
+    def test_matches_single_builds(self):
+        results = self.service.build_token_batch(self.items)
+
+        self.assertEqual([entry["result"] for entry in results], [self.expected(item) for item in self.items])
+
+    def test_item_errors_do_not_fail_the_batch(self):
+        items = [
+            self.items[0],
+            {"header": {"alg": "HS256", "typ": "JWT"}, "payload": {}, "secret": "12345678"},
+            {"header": {"alg": "hs256", "typ": "JWT"}, "payload": {"a": 1}, "secret": "12345678"},
+            [],
+            self.items[1],
+        ]
+
+        results = self.service.build_token_batch(items)
+
+        self.assertEqual([entry["index"] for entry in results], list(range(len(items))))
+        self.assertEqual(results[0]["result"], self.expected(items[0]))
+        self.assertIn("payload", results[1]["error"]["details"])
+        self.assertNotIn("details", results[2]["error"])
+        self.assertIn("error", results[3])
+        self.assertEqual(results[4]["result"], self.expected(items[4]))
+
+    def test_parallel_build_matches_serial(self):
+        with mock.patch.object(jwt_service, "_BUILD_BATCH_PARALLEL_MIN_ITEMS", 1), \
+                mock.patch.object(jwt_service, "_BATCH_MAX_WORKERS", 2), \
+                mock.patch.object(jwt_service, "ENCODER_BACKEND", "compiled-turing"):
+            parallel = self.service.build_token_batch(self.items)
+
+        self.assertEqual(parallel, self.service.build_token_batch(self.items))
+
+
+if __name__ == '__main__':
+    unittest.main()
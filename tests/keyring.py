@@ -0,0 +1,86 @@
+import hmac
+import unittest
+
+from domain.signing_algorithm import SigningAlgorithm
+from schemas.req_body import BuildTokenReqSchema
+from services.jwt_service import JwtService, analysis_cache
+from services.keyring import Keyring, keyring
+
+
+class KeyringTest(unittest.TestCase):
+
+    def test_copies_match_fresh_hmacs(self):
+        ring = Keyring({"k1": "first-secret", "k2": "second-secret"})
+
+        for alg in SigningAlgorithm:
+            mac = ring.new_hmac("k1", alg)
+            mac.update(b"message")
+            self.assertEqual(mac.digest(), hmac.new(b"first-secret", b"message", alg.get_hash_function()).digest())
+
+        self.assertIn("k2", ring)
+        self.assertNotIn("k3", ring)
+        self.assertNotIn(["k1"], ring)
+        with self.assertRaises(KeyError):
+            ring.new_hmac("k3", SigningAlgorithm.HS256)
+
+    def test_secrets_are_not_kept(self):
+        ring = Keyring({"k1": "first-secret"})
+
+        self.assertNotIn("first-secret", repr(vars(ring)))
+
+
+class KeyringSigningTest(unittest.TestCase):
+
+    def setUp(self):
+        analysis_cache.clear()
+        keyring.load({"k1": "first-secret"})
+        keyring.signing = True
+        self.service = JwtService()
+        self.header = {"alg": "HS384", "typ": "JWT", "kid": "k1"}
+
+    def tearDown(self):
+        analysis_cache.clear()
+        keyring.load({})
+        keyring.signing = False
+
+    def test_build_and_verify_with_kid(self):
+        token = self.service.build_token(self.header, {"sub": "user"}, None)["token"]
+
+        self.assertEqual(token, self.service.build_token(self.header, {"sub": "user"}, "first-secret")["token"])
+        self.assertTrue(self.service.analyze_token(token, None)["cryptographic"])
+        self.assertFalse(self.service.analyze_token(token, "other-secret")["cryptographic"])
+
+    def test_unknown_kid_is_not_verified(self):
+        token = self.service.build_token(dict(self.header, kid="k2"), {"sub": "user"}, "first-secret")["token"]
+
+        self.assertNotIn("cryptographic", self.service.analyze_token(token, None))
+
+    def test_batch_builds_with_kid(self):
+        results = self.service.build_token_batch([
+            {"header": self.header, "payload": {"sub": "user"}},
+            {"header": dict(self.header, kid="k2"), "payload": {"sub": "user"}},
+        ])
+
+        self.assertEqual(results[0]["result"], self.service.build_token(self.header, {"sub": "user"}, None))
+        self.assertEqual(results[1]["error"]["details"], {"secret": ["La clave secreta es obligatoria."]})
+
+    def test_secret_is_optional_with_known_kid(self):
+        schema = BuildTokenReqSchema()
+
+        self.assertEqual(schema.validate({"header": self.header, "payload": {"sub": "user"}}), {})
+        self.assertEqual(schema.validate({"header": dict(self.header, kid="k2"), "payload": {"sub": "user"}}),
+                         {"secret": ["La clave secreta es obligatoria."]})
+
+    def test_signing_with_kid_needs_opt_in(self):
+        keyring.signing = False
+        token = self.service.build_token(self.header, {"sub": "user"}, "first-secret")["token"]
+
+        self.assertEqual(BuildTokenReqSchema().validate({"header": self.header, "payload": {"sub": "user"}}),
+                         {"secret": ["La clave secreta es obligatoria."]})
+        self.assertEqual(self.service.build_token_batch([{"header": self.header, "payload": {"sub": "user"}}])[0]
+                         ["error"]["details"], {"secret": ["La clave secreta es obligatoria."]})
+        self.assertTrue(self.service.analyze_token(token, None)["cryptographic"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+
+from utils.lru_cache import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = LRUCache(max_entries=4, max_bytes=100)
+
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1, size=10)
+        self.assertEqual(cache.get("a"), 1)
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"], stats["bytes"]), (1, 1, 1, 10))
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = LRUCache(max_entries=2, max_bytes=100)
+        cache.put("a", 1, size=1)
+        cache.put("b", 2, size=1)
+        cache.get("a")
+        cache.put("c", 3, size=1)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_evicts_by_size(self):
+        cache = LRUCache(max_entries=10, max_bytes=10)
+        cache.put("a", 1, size=4)
+        cache.put("b", 2, size=4)
+        cache.put("c", 3, size=4)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+    def test_skips_values_over_budget(self):
+        cache = LRUCache(max_entries=10, max_bytes=10)
+        cache.put("a", 1, size=4)
+        cache.put("big", 2, size=11)
+
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_replacing_a_key_updates_size(self):
+        cache = LRUCache(max_entries=10, max_bytes=10)
+        cache.put("a", 1, size=6)
+        cache.put("a", 2, size=3)
+
+        self.assertEqual(cache.get("a"), 2)
+        self.assertEqual(cache.stats()["bytes"], 3)
+
+    def test_expired_entries_are_dropped(self):
+        cache = LRUCache(max_entries=10, max_bytes=100)
+
+        with mock.patch("utils.lru_cache.time.time", return_value=1000):
+            cache.put("a", 1, size=5, expires_at=1010)
+            cache.put("b", 2, size=5, expires_at=1020)
+            cache.put("c", 3, size=5)
+            self.assertEqual(cache.get("a"), 1)
+
+        with mock.patch("utils.lru_cache.time.time", return_value=1010):
+            self.assertIsNone(cache.get("a"))
+
+        with mock.patch("utils.lru_cache.time.time", return_value=1020):
+            cache.put("d", 4, size=5)
+
+        stats = cache.stats()
+        self.assertEqual((stats["expirations"], stats["entries"], stats["bytes"]), (2, 2, 10))
+        self.assertEqual(cache.get("c"), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
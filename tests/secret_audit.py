@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from http import HTTPStatus
+from unittest import mock
+
+from exceptions.service_exception import ServiceException
+from services import secret_audit
+from services.jwt_service import JwtService
+from services.secret_audit import audit_target, iter_secret_audit, resolve_wordlist
+from utils.process_pool import shutdown_process_pools
+
+
+class SecretAuditTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.wordlist = os.path.join(cls.directory.name, "common.txt")
+        with open(cls.wordlist, "wb") as file:
+            file.write(b"".join(b"guess-%d\r\n" % i for i in range(10000)) + b"\npassword123\nlast-one\n")
+
+        cls.token = JwtService().build_token({"alg": "HS384", "typ": "JWT"}, {"sub": "1"}, "password123")["token"]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_process_pools()
+        cls.directory.cleanup()
+
+    def audit(self, **kwargs):
+        records = list(iter_secret_audit(audit_target(self.token), self.wordlist, **kwargs))
+        self.assertTrue(all(record["event"] == "progress" for record in records[:-1]))
+        self.assertEqual(records[-1]["event"], "result")
+        return records[-1]
+
+    def test_finds_secret(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                result = self.audit(workers=workers)
+
+                self.assertTrue(result["found"])
+                self.assertEqual(result["secret"], "password123")
+                self.assertEqual(result["stop_reason"], "found")
+                self.assertEqual(result["tested"], 10001)
+
+    def test_candidate_budget(self):
+        result = self.audit(max_candidates=10000, workers=1)
+
+        self.assertEqual((result["found"], result["stop_reason"], result["tested"]), (False, "candidate_budget", 10000))
+        self.assertNotIn("secret", result)
+
+        result = self.audit(max_candidates=10002, workers=1)
+        self.assertEqual(result["stop_reason"], "found")
+
+    def test_exhausted(self):
+        token = JwtService().build_token({"alg": "HS256", "typ": "JWT"}, {"sub": "1"}, "not-in-the-list")["token"]
+
+        result = list(iter_secret_audit(audit_target(token), self.wordlist, max_candidates=10002, workers=2))[-1]
+
+        self.assertEqual((result["found"], result["stop_reason"], result["tested"]), (False, "exhausted", 10002))
+
+    def test_time_budget(self):
+        result = self.audit(max_seconds=1e-9, workers=1)
+
+        self.assertEqual((result["found"], result["stop_reason"]), (False, "time_budget"))
+        self.assertLess(result["tested"], 10001)
+
+    def test_rejects_tokens_that_cannot_be_audited(self):
+        header, payload, signature = self.token.split(".")
+        for token in (f"{header}.{payload}", f"{header}.{payload}.{signature[:-4]}",
+                      JwtService().build_token({"alg": "HS256", "typ": "JWT"}, {}, "12345678")["token"][:-1] + "_"):
+            with self.subTest(token=token), self.assertRaises(ServiceException) as context:
+                audit_target(token)
+            self.assertEqual(context.exception.get_status(), HTTPStatus.UNPROCESSABLE_ENTITY)
+            self.assertIn("token", context.exception.get_errors())
+
+    def test_wordlist_stays_inside_directory(self):
+        with mock.patch.object(secret_audit, "_WORDLIST_DIR", self.directory.name):
+            self.assertEqual(str(resolve_wordlist("common.txt")), os.path.realpath(self.wordlist))
+
+            for name in ("../common.txt", "/etc/passwd", "missing.txt", "."):
+                with self.subTest(name=name), self.assertRaises(ServiceException) as context:
+                    resolve_wordlist(name)
+                self.assertEqual(context.exception.get_errors(), {"wordlist": [f'No existe la lista de palabras "{name}".']})
+
+        with mock.patch.object(secret_audit, "_WORDLIST_DIR", None), self.assertRaises(ServiceException) as context:
+            resolve_wordlist("common.txt")
+        self.assertEqual(context.exception.get_status(), HTTPStatus.SERVICE_UNAVAILABLE)
+
+    def test_endpoint_default_leaves_cores_free(self):
+        result = {"event": "result", "found": False}
+        with mock.patch("os.cpu_count", return_value=16), \
+                mock.patch.object(secret_audit, "iter_secret_audit", return_value=iter([result])) as audit, \
+                mock.patch("builtins.print"):
+            secret_audit.main([self.token, self.wordlist])
+
+        self.assertEqual(audit.call_args.args[-1], 16)
+        if not os.getenv("SECRET_AUDIT_WORKERS"):
+            self.assertEqual(secret_audit._WORKERS, max(1, (os.cpu_count() or 1) // 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import itertools
+import random
+import unittest
+
+from utils.json.symbol_table import build_symbol_table, iter_symbol_table
+
+
+def reference_symbol_table(data, prefix=""):
+    """The original mutually recursive builder, kept as the expected output."""
+    symbols = []
+
+    if isinstance(data, dict):
+        for key, value in data.items():
+            symbols.extend(reference_process_value(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            symbols.extend(reference_process_value(item, f"{prefix}[{i}]"))
+    elif prefix:
+        symbols.extend(reference_process_value(data, prefix))
+
+    return symbols
+
+
+def reference_process_value(value, path):
+    if value is None:
+        return [{"name": path, "type": "null", "value": "null"}]
+    if isinstance(value, bool):
+        return [{"name": path, "type": "boolean", "value": "true" if value else "false"}]
+    if isinstance(value, (int, float)):
+        return [{"name": path, "type": "number", "value": str(value)}]
+    if isinstance(value, str):
+        return [{"name": path, "type": "string", "value": value}]
+    if isinstance(value, dict):
+        return [{"name": path, "type": "object", "value": f"{{...}} ({len(value)} claves)"}] + \
+            reference_symbol_table(value, path)
+    if isinstance(value, list):
+        symbols = [{"name": path, "type": "array", "value": f"[...] ({len(value)} elementos)"}]
+        for i, item in enumerate(value):
+            symbols.extend(reference_process_value(item, f"{path}[{i}]"))
+        return symbols
+    return []
+
+
+def random_value(rng, depth):
+    kind = rng.randrange(8 if depth < 4 else 6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.random() < 0.5
+    if kind == 2:
+        return rng.randrange(-1000, 1000)
+    if kind == 3:
+        return rng.random() * 10 ** rng.randrange(-5, 25)
+    if kind in (4, 5):
+        return rng.choice(["", "a", "b.c", "[0]", "x y"])
+    if kind == 6:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {rng.choice(["", "a", "b", "c.d", "0"]): random_value(rng, depth + 1) for _ in range(rng.randrange(4))}
+
+
+class SymbolTableTest(unittest.TestCase):
+
+    def test_matches_recursive_builder(self):
+        rng = random.Random(20)
+        cases = [
+            ({"sub": "1", "roles": ["a", {"b": [None, True, 1.5]}], "": {"x": {}}}, ""),
+            ([1, [2, []]], ""),
+            ([1, [2, []]], "root"),
+            ("scalar", "path"),
+            ("scalar", ""),
+            ({"a": object()}, ""),
+        ]
+        cases += [(random_value(rng, 0), rng.choice(["", "p"])) for _ in range(500)]
+
+        for data, prefix in cases:
+            with self.subTest(data=data, prefix=prefix):
+                self.assertEqual(build_symbol_table(data, prefix), reference_symbol_table(data, prefix))
+
+    def test_deep_nesting_does_not_recurse(self):
+        data = value = {}
+        for _ in range(5000):
+            value["a"] = {}
+            value = value["a"]
+        value["a"] = [1]
+
+        symbols = build_symbol_table(data)
+
+        self.assertEqual(len(symbols), 5002)
+        self.assertEqual(symbols[-1], {"name": ".".join(["a"] * 5001) + "[0]", "type": "number", "value": "1"})
+
+    def test_stops_early(self):
+        data = {"a": list(range(10 ** 6))}
+
+        first = list(itertools.islice(iter_symbol_table(data), 3))
+
+        self.assertEqual([entry["name"] for entry in first], ["a", "a[0]", "a[1]"])
+
+
+if __name__ == '__main__':
+    unittest.main()
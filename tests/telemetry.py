@@ -0,0 +1,53 @@
+import unittest
+
+from turing_machine import telemetry
+from turing_machine.chunked import _encode_slice
+from turing_machine.loader import get_tm
+from turing_machine.tape_io import BitTapeInput
+from turing_machine.telemetry import Histogram, TelemetryRecorder, TMRunStats
+
+
+class TelemetryTest(unittest.TestCase):
+
+    def test_compiled_stats_match_dtm_trace(self):
+        data = b'{"alg":"HS256","typ":"JWT"}'
+
+        with telemetry.capture() as runs:
+            telemetry.trace_dtm("b64url_encode", get_tm("b64url_encode"), BitTapeInput(data), len(data))
+        dtm_stats = runs[0]
+
+        _, stats = _encode_slice(data, len(data), "b64url_encode", trace=True)
+
+        self.assertEqual(stats.steps, dtm_stats.steps)
+        self.assertEqual(stats.state_visits, dtm_stats.state_visits)
+        self.assertEqual(stats.max_tape_length, dtm_stats.max_tape_length)
+        self.assertLess(stats.macro_steps, stats.steps)
+
+    def test_untraced_slice_has_no_stats(self):
+        _, stats = _encode_slice(b"hello", 12, "b64url_encode")
+        self.assertIsNone(stats)
+
+    def test_histogram_buckets(self):
+        histogram = Histogram()
+        for value in [0, 1, 2, 3, 4, 5, 1000]:
+            histogram.record(value)
+
+        snapshot = histogram.to_dict()
+        self.assertEqual(snapshot["buckets"], {"<=1": 2, "<=2": 1, "<=4": 2, "<=8": 1, "<=1024": 1})
+        self.assertEqual(snapshot["count"], 7)
+        self.assertEqual(snapshot["max"], 1000)
+
+    def test_recorder_keeps_slowest_runs(self):
+        recorder = TelemetryRecorder(slowest_size=2)
+        for wall_time in [0.3, 0.1, 0.5, 0.2]:
+            recorder.record(TMRunStats(machine="b64url_encode", input_bytes=3, steps=10,
+                                       wall_time=wall_time, state_visits={"q0": 1}))
+
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["runs"], 4)
+        self.assertEqual(snapshot["state_visits"], {"q0": 4})
+        self.assertEqual([run["wall_time_us"] for run in snapshot["slowest"]], [0.5e6, 0.3e6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,24 @@
-from pathlib import Path
-from automata.tm.dtm import DTM
-from turing_machine.loader import load_tm
+from turing_machine.compiled_tm import CompiledTM
+from turing_machine.loader import get_tm, get_compiled_tm, machine_config_path
 
-config_path = Path(__file__).parent / 'b64_encode_tm_config.json'
+config_path = machine_config_path("b64_encode")
 
 if not config_path.exists():
     raise FileNotFoundError(f"Config file not found: {config_path}")
 
-b64_encode_tm: DTM = load_tm(str(config_path))
+
+def get_b64_encode_tm():
+    return get_tm("b64_encode")
+
+
+def get_b64_encode_compiled_tm() -> CompiledTM:
+    return get_compiled_tm("b64_encode")
+
+
+# The machines are built on first use, not at import time.
+def __getattr__(name: str):
+    if name == "b64_encode_tm":
+        return get_b64_encode_tm()
+    if name == "b64_encode_compiled_tm":
+        return get_b64_encode_compiled_tm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
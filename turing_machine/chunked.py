@@ -0,0 +1,82 @@
+import os
+import time
+from typing import Optional, Tuple, Union
+
+from turing_machine import telemetry
+from turing_machine.loader import get_compiled_tm
+from turing_machine.tape_io import BitTapeInput, SymbolSink
+from turing_machine.telemetry import TMRunStats
+from utils.process_pool import get_process_pool
+
+__all__ = ['encode_chunked']
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def encode_chunked(data: BytesLike, chunk_size: int = 12, parallel_threshold: int = 65536,
+                   max_workers: Optional[int] = None, machine: str = "b64_encode") -> bytes:
+    """
+    Encode ``data`` by running the registered base64 ``machine`` on
+    independent slices of ``chunk_size`` bytes (rounded down to a multiple
+    of 3, so only the last slice can produce padding) and concatenating the
+    outputs.
+
+    Inputs of at least ``parallel_threshold`` bytes are split across a
+    process pool; smaller inputs are encoded in the calling process.
+
+    With telemetry enabled, the runs of one call are recorded as a single
+    ``TMRunStats``.
+    """
+    view = memoryview(data).cast("B")
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    trace = telemetry.ENABLED
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(view) < parallel_threshold or workers < 2:
+        output, stats = _encode_slice(view, chunk_size, machine, trace)
+        if stats is not None:
+            telemetry.record(stats)
+        return output
+
+    span = -(-len(view) // workers)
+    span += -span % chunk_size
+    slices = [view[start:start + span].tobytes() for start in range(0, len(view), span)]
+    count = len(slices)
+
+    pool = get_process_pool("b64_chunked", workers)
+    results = list(pool.map(_encode_slice, slices, [chunk_size] * count, [machine] * count, [trace] * count))
+
+    if trace:
+        stats = TMRunStats(machine=machine, input_bytes=len(view))
+        for _, slice_stats in results:
+            stats.merge(slice_stats)
+        telemetry.record(stats)
+
+    return b"".join(output for output, _ in results)
+
+
+def _encode_slice(data: BytesLike, chunk_size: int, machine: str,
+                  trace: bool = False) -> Tuple[bytes, Optional[TMRunStats]]:
+    compiled_tm = get_compiled_tm(machine)
+    view = memoryview(data)
+    sink = SymbolSink()
+
+    if not trace:
+        for start in range(0, len(view), chunk_size):
+            compiled_tm.read_input_macro(BitTapeInput(view[start:start + chunk_size]), sink=sink)
+        return bytes(sink.buffer), None
+
+    stats = TMRunStats(machine=machine, input_bytes=len(view))
+    started = time.perf_counter()
+    for start in range(0, len(view), chunk_size):
+        result = compiled_tm.read_input_macro(
+            BitTapeInput(view[start:start + chunk_size]),
+            sink=sink,
+            state_visits=stats.state_visits
+        )
+        stats.steps += result.steps
+        stats.macro_steps += result.macro_steps
+        stats.max_tape_length = max(stats.max_tape_length, result.tape_length)
+    stats.wall_time = time.perf_counter() - started
+
+    return bytes(sink.buffer), stats
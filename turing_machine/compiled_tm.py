@@ -0,0 +1,333 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from automata.base.exceptions import RejectionException
+
+from turing_machine.tape_io import BitTapeInput, SymbolSink
+
+__all__ = ['CompiledTM', 'TMRunResult']
+
+_MOVES = {"L": -1, "N": 0, "R": 1}
+
+TapeInput = Union[str, BitTapeInput]
+Transition = Tuple[int, int, int]
+# (next row, written block, exit offset, single steps, lowest offset, highest offset)
+MacroStep = Tuple[int, bytes, int, int, int, int]
+
+
+@dataclass(frozen=True)
+class TMRunResult:
+    state: str
+    tape: Optional[str]
+    tape_length: int
+    position: int
+    steps: int
+    macro_steps: int
+
+
+class CompiledTM:
+    """
+    Table-driven equivalent of automata-lib's ``DTM``.
+
+    States and tape symbols are mapped to dense integers so a run is a plain
+    loop over a ``bytearray`` tape and a flat transition table indexed by
+    ``state_row + symbol``. The final tape, head position and state are
+    identical to the ones ``DTM.read_input`` produces.
+
+    ``read_input_macro`` runs the same machine in macro steps: the tape is cut
+    into blocks of ``block_size`` cells and the combined effect of every
+    (state, entry offset, block contents) that actually occurs is computed
+    once and then applied as a whole.
+
+    Both modes accept a ``BitTapeInput`` whose cells are pulled only when the
+    head first reaches them, and an optional ``SymbolSink`` that receives the
+    non-blank symbols of the final tape instead of ``TMRunResult.tape``.
+    Passing a ``state_visits`` dict to ``read_input_macro`` adds the number
+    of single steps taken from each state to it; runs without it skip that
+    bookkeeping.
+    """
+
+    def __init__(self, states: Iterable[str], input_symbols: Iterable[str], tape_symbols: Iterable[str],
+                 transitions: Dict[str, Dict[str, Tuple[str, str, str]]], initial_state: str,
+                 blank_symbol: str, final_states: Iterable[str], block_size: int = 24,
+                 max_macro_cache: int = 65536):
+        states = list(dict.fromkeys(states))
+        symbols = list(dict.fromkeys([blank_symbol, *tape_symbols, *input_symbols]))
+
+        for symbol in symbols:
+            if len(symbol) != 1 or not symbol.isascii():
+                raise ValueError(f"Tape symbol '{symbol}' must be a single ASCII character")
+
+        width = len(symbols)
+        state_rows = {state: index * width for index, state in enumerate(states)}
+        symbol_ids = {symbol: index for index, symbol in enumerate(symbols)}
+
+        table: List[Optional[Transition]] = [None] * (len(states) * width)
+        for state, state_transitions in transitions.items():
+            for read_symbol, (next_state, write_symbol, move_direction) in state_transitions.items():
+                table[state_rows[state] + symbol_ids[read_symbol]] = (
+                    state_rows[next_state],
+                    symbol_ids[write_symbol],
+                    _MOVES[move_direction]
+                )
+
+        self._load_tables({
+            "states": states,
+            "symbols": symbols,
+            "table": table,
+            "initial_row": state_rows[initial_state],
+            "final_rows": sorted(state_rows[state] for state in final_states),
+            "blank": symbol_ids[blank_symbol],
+        }, block_size, max_macro_cache)
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any], block_size: int = 24, max_macro_cache: int = 65536) -> "CompiledTM":
+        machine = cls.__new__(cls)
+        machine._load_tables(tables, block_size, max_macro_cache)
+        return machine
+
+    def to_tables(self) -> Dict[str, Any]:
+        return {
+            "states": self.states,
+            "symbols": self.symbols,
+            "table": self._table,
+            "initial_row": self._initial_row,
+            "final_rows": sorted(self._final_rows),
+            "blank": self._blank,
+        }
+
+    def _load_tables(self, tables: Dict[str, Any], block_size: int, max_macro_cache: int) -> None:
+        if block_size < 1:
+            raise ValueError("block_size must be a positive integer")
+
+        self.states: List[str] = tables["states"]
+        self.symbols: List[str] = tables["symbols"]
+        self._width = len(self.symbols)
+        self._table: List[Optional[Transition]] = tables["table"]
+        self._initial_row: int = tables["initial_row"]
+        self._final_rows = frozenset(tables["final_rows"])
+        self._blank: int = tables["blank"]
+        self.blank_symbol = self.symbols[self._blank]
+
+        self._encode_table = bytearray(range(256))
+        self._decode_table = bytearray(range(256))
+        self._known = bytearray(256)
+        for index, symbol in enumerate(self.symbols):
+            self._encode_table[ord(symbol)] = index
+            self._decode_table[index] = ord(symbol)
+            self._known[ord(symbol)] = 1
+
+        self.block_size = block_size
+        self._max_macro_cache = max_macro_cache
+        self._macro_cache: Dict[Tuple[int, int, bytes], MacroStep] = {}
+        self._visits_cache: Dict[Tuple[int, int, bytes], Tuple[Tuple[int, int], ...]] = {}
+
+    def read_input(self, tape_input: TapeInput, sink: Optional[SymbolSink] = None) -> TMRunResult:
+        tape, source = self._load_tape(tape_input)
+        row, position, steps = self._run(tape, source)
+
+        for chunk in source:
+            tape += chunk
+
+        return self._result(row, tape, position, steps, steps, sink)
+
+    def read_input_macro(self, tape_input: TapeInput, sink: Optional[SymbolSink] = None,
+                         state_visits: Optional[Dict[str, int]] = None) -> TMRunResult:
+        block_size = self.block_size
+        blank_block = bytes([self._blank]) * block_size
+        pending, source = self._load_tape(tape_input)
+        input_length = len(tape_input) or 1
+
+        origin = block_size
+        store = bytearray(blank_block)
+        self._fill_block(store, pending, source, blank_block)
+
+        final_rows = self._final_rows
+        cache = self._macro_cache
+
+        row = self._initial_row
+        index = origin
+        lowest = highest = origin
+        steps = macro_steps = 0
+        row_visits: Optional[Dict[int, int]] = {} if state_visits is not None else None
+
+        while row not in final_rows:
+            start = index - index % block_size
+            key = (row, index - start, bytes(store[start:start + block_size]))
+
+            macro = cache.get(key)
+            if macro is None:
+                macro = self._compile_block(*key)
+                if len(cache) >= self._max_macro_cache:
+                    cache.clear()
+                cache[key] = macro
+
+            if row_visits is not None:
+                for visited_row, count in self._block_visits(key):
+                    row_visits[visited_row] = row_visits.get(visited_row, 0) + count
+
+            row, written, exit_offset, block_steps, low, high = macro
+            store[start:start + block_size] = written
+            steps += block_steps
+            macro_steps += 1
+            lowest = min(lowest, start + low)
+            highest = max(highest, start + high)
+            index = start + exit_offset
+
+            if index < 0:
+                store[0:0] = blank_block
+                index += block_size
+                origin += block_size
+                lowest += block_size
+                highest += block_size
+            elif index >= len(store):
+                self._fill_block(store, pending, source, blank_block)
+
+        store += pending
+        for chunk in source:
+            store += chunk
+
+        # The DTM tape only spans the input plus the cells the head reached.
+        first = min(origin, lowest)
+        last = max(origin + input_length - 1, highest)
+        tape = store[first:last + 1]
+
+        if row_visits is not None:
+            for visited_row, count in row_visits.items():
+                state = self.states[visited_row // self._width]
+                state_visits[state] = state_visits.get(state, 0) + count
+
+        return self._result(row, tape, index - first, steps, macro_steps, sink)
+
+    @staticmethod
+    def _fill_block(store: bytearray, pending: bytearray, source: Iterator[bytes], blank_block: bytes) -> None:
+        block_size = len(blank_block)
+        while len(pending) < block_size:
+            chunk = next(source, None)
+            if chunk is None:
+                break
+            pending += chunk
+
+        block = pending[:block_size]
+        del pending[:block_size]
+        store += block
+        store += blank_block[len(block):]
+
+    def _compile_block(self, row: int, offset: int, window: bytes) -> MacroStep:
+        table = self._table
+        final_rows = self._final_rows
+        block_size = self.block_size
+
+        cells = bytearray(window)
+        lowest = highest = offset
+        steps = 0
+
+        while row not in final_rows and 0 <= offset < block_size:
+            transition = table[row + cells[offset]]
+            if transition is None:
+                raise self._rejection(row, cells[offset])
+
+            row, cells[offset], move = transition
+            offset += move
+            steps += 1
+
+            if offset < lowest:
+                lowest = offset
+            elif offset > highest:
+                highest = offset
+
+        return row, bytes(cells), offset, steps, lowest, highest
+
+    def _block_visits(self, key: Tuple[int, int, bytes]) -> Tuple[Tuple[int, int], ...]:
+        visits = self._visits_cache.get(key)
+        if visits is not None:
+            return visits
+
+        row, offset, window = key
+        table = self._table
+        final_rows = self._final_rows
+        cells = bytearray(window)
+        counts: Dict[int, int] = {}
+
+        while row not in final_rows and 0 <= offset < self.block_size:
+            counts[row] = counts.get(row, 0) + 1
+            row, cells[offset], move = table[row + cells[offset]]
+            offset += move
+
+        visits = tuple(counts.items())
+        if len(self._visits_cache) >= self._max_macro_cache:
+            self._visits_cache.clear()
+        self._visits_cache[key] = visits
+        return visits
+
+    def _load_tape(self, tape_input: TapeInput) -> Tuple[bytearray, Iterator[bytes]]:
+        known = self._known
+
+        if isinstance(tape_input, BitTapeInput):
+            if not (known[ord("0")] and known[ord("1")]):
+                raise RejectionException("The input contains symbols outside the tape alphabet")
+
+            encode_table = self._encode_table
+            source = (chunk.translate(encode_table) for chunk in tape_input.chunks())
+            return bytearray(next(source, b"") or bytes([self._blank])), source
+
+        if not tape_input:
+            return bytearray([self._blank]), iter(())
+
+        if not tape_input.isascii():
+            raise RejectionException("The input contains symbols outside the tape alphabet")
+
+        raw = tape_input.encode("ascii")
+        if not all(known[byte] for byte in set(raw)):
+            raise RejectionException("The input contains symbols outside the tape alphabet")
+
+        return bytearray(raw.translate(self._encode_table)), iter(())
+
+    def _run(self, tape: bytearray, source: Iterator[bytes]) -> Tuple[int, int, int]:
+        table = self._table
+        final_rows = self._final_rows
+        blank = self._blank
+
+        row = self._initial_row
+        position = 0
+        steps = 0
+
+        while row not in final_rows:
+            transition = table[row + tape[position]]
+            if transition is None:
+                raise self._rejection(row, tape[position])
+
+            row, tape[position], move = transition
+            position += move
+            steps += 1
+
+            if position < 0:
+                tape.insert(0, blank)
+                position = 0
+            elif position == len(tape):
+                tape += next(source, None) or bytes([blank])
+
+        return row, position, steps
+
+    def _rejection(self, row: int, symbol: int) -> RejectionException:
+        return RejectionException(
+            "The machine entered a non-final configuration for which no "
+            "transition is defined ({}, {})".format(self.states[row // self._width], self.symbols[symbol])
+        )
+
+    def _result(self, row: int, tape: bytearray, position: int, steps: int, macro_steps: int,
+                sink: Optional[SymbolSink]) -> TMRunResult:
+        if sink is not None:
+            sink.write(tape.translate(self._decode_table, bytes([self._blank])))
+            symbols = None
+        else:
+            symbols = tape.translate(self._decode_table).decode("ascii")
+
+        return TMRunResult(
+            state=self.states[row // self._width],
+            tape=symbols,
+            tape_length=len(tape),
+            position=position,
+            steps=steps,
+            macro_steps=macro_steps
+        )
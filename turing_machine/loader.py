@@ -1,6 +1,25 @@
+import contextlib
+import hashlib
 import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
 
-from automata.tm.dtm import DTM
+from turing_machine.compiled_tm import CompiledTM
+
+ARTIFACT_VERSION = 3
+
+# Moves are stored in artifacts as move + 1.
+_MOVES_FROM_BYTE = (-1, 0, 1)
+
+_CONFIG_DIR = Path(__file__).parent
+
+MACHINE_CONFIGS = {
+    "b64_encode": _CONFIG_DIR / "b64_encode_tm_config.json",
+    "b64url_encode": _CONFIG_DIR / "b64url_encode_tm_config.json",
+}
 
 
 def expand_transitions(config):
@@ -31,9 +50,15 @@ def expand_transitions(config):
     return expanded_transitions
 
 
-def load_tm(json_path: str):
+def read_config(json_path: str):
     with open(json_path, 'r') as file:
-        config = json.load(file)
+        return json.load(file)
+
+
+def load_tm(json_path: str):
+    from automata.tm.dtm import DTM
+
+    config = read_config(json_path)
 
     states = set(config["all_states"])
     input_symbols = set(config["input_symbols"])
@@ -53,4 +78,166 @@ def load_tm(json_path: str):
         final_states=final_states
     )
 
-    return turing_machine
\ No newline at end of file
+    return turing_machine
+
+
+def load_compiled_tm(json_path: str, block_size: int = 24, use_artifact: bool = True) -> CompiledTM:
+    """
+    Build a ``CompiledTM`` from a JSON config.
+
+    With ``use_artifact`` the compiled tables are stored next to the config
+    in a file named after ``ARTIFACT_VERSION`` and the SHA-256 of the config,
+    and later loads read that file instead of expanding the transitions again.
+    Editing the config or bumping the version simply produces a new artifact.
+    """
+    raw_config = Path(json_path).read_bytes()
+
+    if not use_artifact:
+        return _compile_tm(json.loads(raw_config), block_size)
+
+    config_hash = hashlib.sha256(raw_config).hexdigest()
+    path = artifact_path(json_path, config_hash)
+
+    tables = _read_artifact(path, config_hash)
+    if tables is not None:
+        return CompiledTM.from_tables(tables, block_size=block_size)
+
+    machine = _compile_tm(json.loads(raw_config), block_size)
+    _write_artifact(path, config_hash, machine)
+    return machine
+
+
+def machine_config_path(name: str) -> Path:
+    try:
+        return MACHINE_CONFIGS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown Turing machine '{name}'. Available machines: {', '.join(MACHINE_CONFIGS)}"
+        ) from None
+
+
+@lru_cache(maxsize=None)
+def get_tm(name: str):
+    return load_tm(str(machine_config_path(name)))
+
+
+@lru_cache(maxsize=None)
+def get_compiled_tm(name: str) -> CompiledTM:
+    return load_compiled_tm(str(machine_config_path(name)))
+
+
+def artifact_path(json_path: str, config_hash: str) -> Path:
+    config = Path(json_path)
+    return config.with_name(f"{config.stem}.v{ARTIFACT_VERSION}.{config_hash[:16]}.tmcache")
+
+
+def _compile_tm(config, block_size: int) -> CompiledTM:
+    return CompiledTM(
+        states=config["all_states"],
+        input_symbols=config["input_symbols"],
+        tape_symbols=config["tape_symbols"],
+        transitions=expand_transitions(config),
+        initial_state=config["initial_state"],
+        blank_symbol=config["blank_symbol"],
+        final_states=config["final_states"],
+        block_size=block_size
+    )
+
+
+def _read_artifact(path: Path, config_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    An artifact is a JSON header line (version, config hash, states,
+    symbols, initial/final rows, blank) followed by the table as bytes: one
+    presence flag per (state, symbol) slot, then the state, written symbol
+    and move + 1 of every defined transition. The file is data to check, not
+    trusted code, and the byte columns are range-checked in bulk before the
+    table is built.
+    """
+    try:
+        with open(path, "rb") as file:
+            header = json.loads(file.readline())
+            body = file.read()
+    except (OSError, ValueError):
+        return None
+
+    if (not isinstance(header, dict)
+            or header.get("version") != ARTIFACT_VERSION
+            or header.get("config_hash") != config_hash):
+        return None
+
+    return _decode_tables(header, body)
+
+
+def _decode_tables(header: Dict[str, Any], body: bytes) -> Optional[Dict[str, Any]]:
+    states, symbols = header.get("states"), header.get("symbols")
+    if not (isinstance(states, list) and 0 < len(states) <= 256 and all(isinstance(state, str) for state in states)
+            and isinstance(symbols, list) and 0 < len(symbols) <= 256
+            and all(isinstance(symbol, str) and len(symbol) == 1 and symbol.isascii() for symbol in symbols)):
+        return None
+
+    width = len(symbols)
+    slots = len(states) * width
+    rows = range(0, slots, width)
+    initial_row, final_rows, blank = header.get("initial_row"), header.get("final_rows"), header.get("blank")
+    if not (type(initial_row) is int and initial_row in rows
+            and isinstance(final_rows, list) and all(type(row) is int and row in rows for row in final_rows)
+            and type(blank) is int and 0 <= blank < width):
+        return None
+
+    present = body[:slots]
+    defined = present.count(1)
+    next_states = body[slots:slots + defined]
+    written = body[slots + defined:slots + 2 * defined]
+    moves = body[slots + 2 * defined:]
+    # bytes.translate with a delete set leaves only the bytes that are out of range.
+    if (len(present) != slots or len(moves) != defined
+            or present.translate(None, b"\0\1")
+            or next_states.translate(None, bytes(range(len(states))))
+            or written.translate(None, bytes(range(width)))
+            or moves.translate(None, b"\0\1\2")):
+        return None
+
+    transitions = zip(map(rows.__getitem__, next_states), written, map(_MOVES_FROM_BYTE.__getitem__, moves))
+    return {
+        "states": states,
+        "symbols": symbols,
+        "table": [next(transitions) if flag else None for flag in present],
+        "initial_row": initial_row,
+        "final_rows": final_rows,
+        "blank": blank,
+    }
+
+
+def _write_artifact(path: Path, config_hash: str, machine: CompiledTM) -> None:
+    tables = machine.to_tables()
+    width = len(tables["symbols"])
+    if len(tables["states"]) > 256 or width > 256:
+        return
+
+    transitions = [transition for transition in tables["table"] if transition is not None]
+    header = {
+        "version": ARTIFACT_VERSION,
+        "config_hash": config_hash,
+        **{key: value for key, value in tables.items() if key != "table"},
+    }
+    body = b"".join([
+        bytes(transition is not None for transition in tables["table"]),
+        bytes(row // width for row, _, _ in transitions),
+        bytes(symbol for _, symbol, _ in transitions),
+        bytes(move + 1 for _, _, move in transitions),
+    ])
+
+    # Write to a temporary file and rename it so concurrent workers never read a partial artifact.
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+            file.write(body)
+        os.replace(tmp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
@@ -0,0 +1,54 @@
+from typing import Iterator, Union
+
+__all__ = ['BitTapeInput', 'SymbolSink']
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class BitTapeInput:
+    """
+    Tape input that exposes the bits of a bytes-like object as ``'0'``/``'1'``
+    symbols, most significant bit first, without building the bit string.
+
+    It behaves as a read-only sequence of symbols, so it can be handed to
+    automata-lib's ``DTM``, and ``chunks`` yields the same symbols as ASCII
+    bytes for ``CompiledTM``, which pulls them only when the head gets there.
+    """
+
+    def __init__(self, data: BytesLike, chunk_size: int = 64):
+        self._data = memoryview(data).cast("B")
+        self._chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return len(self._data) * 8
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("tape index out of range")
+        return "1" if (self._data[index >> 3] >> (7 - (index & 7))) & 1 else "0"
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.chunks():
+            yield from chunk.decode("ascii")
+
+    def chunks(self) -> Iterator[bytes]:
+        data = self._data
+        for start in range(0, len(data), self._chunk_size):
+            chunk = data[start:start + self._chunk_size]
+            bit_count = len(chunk) * 8
+            yield format(int.from_bytes(chunk, "big"), "b").zfill(bit_count).encode("ascii")
+
+
+class SymbolSink:
+    """Collects the non-blank symbols left on a tape as ASCII bytes."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, symbols: BytesLike) -> None:
+        self.buffer += symbols
+
+    def getvalue(self) -> str:
+        return self.buffer.decode("ascii")
@@ -0,0 +1,162 @@
+import heapq
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+__all__ = ['ENABLED', 'TMRunStats', 'Histogram', 'TelemetryRecorder', 'recorder', 'record', 'capture', 'trace_dtm']
+
+# Read once at import time; with telemetry off the encoders never time or count anything.
+ENABLED = os.getenv("TM_TELEMETRY_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class TMRunStats:
+    machine: str
+    input_bytes: int
+    steps: int = 0
+    macro_steps: int = 0
+    max_tape_length: int = 0
+    wall_time: float = 0.0
+    state_visits: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: "TMRunStats") -> None:
+        self.steps += other.steps
+        self.macro_steps += other.macro_steps
+        self.max_tape_length = max(self.max_tape_length, other.max_tape_length)
+        self.wall_time += other.wall_time
+        for state, count in other.state_visits.items():
+            self.state_visits[state] = self.state_visits.get(state, 0) + count
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Histogram:
+    """Counts values in power-of-two buckets, keyed by each bucket's upper bound."""
+
+    def __init__(self):
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        upper = 1 << max(0, int(value) - 1).bit_length()
+        self._buckets[upper] = self._buckets.get(upper, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "max": self.max,
+            "buckets": {f"<={upper}": self._buckets[upper] for upper in sorted(self._buckets)},
+        }
+
+
+class TelemetryRecorder:
+    """Thread-safe aggregate of every recorded machine run in this process."""
+
+    def __init__(self, slowest_size: int = 10):
+        self._lock = threading.Lock()
+        self._slowest_size = slowest_size
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._runs = 0
+            self._histograms = {
+                "steps": Histogram(),
+                "max_tape_length": Histogram(),
+                "wall_time_us": Histogram(),
+                "input_bytes": Histogram(),
+            }
+            self._state_visits: Dict[str, int] = {}
+            self._slowest: List[Tuple[float, int, dict]] = []
+
+    def record(self, stats: TMRunStats) -> None:
+        with self._lock:
+            self._runs += 1
+            self._histograms["steps"].record(stats.steps)
+            self._histograms["max_tape_length"].record(stats.max_tape_length)
+            self._histograms["wall_time_us"].record(stats.wall_time * 1e6)
+            self._histograms["input_bytes"].record(stats.input_bytes)
+
+            for state, count in stats.state_visits.items():
+                self._state_visits[state] = self._state_visits.get(state, 0) + count
+
+            entry = (stats.wall_time, self._runs, {
+                "machine": stats.machine,
+                "input_bytes": stats.input_bytes,
+                "steps": stats.steps,
+                "macro_steps": stats.macro_steps,
+                "wall_time_us": stats.wall_time * 1e6,
+            })
+            if len(self._slowest) < self._slowest_size:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": ENABLED,
+                "runs": self._runs,
+                "histograms": {name: histogram.to_dict() for name, histogram in self._histograms.items()},
+                "state_visits": dict(sorted(self._state_visits.items(), key=lambda item: -item[1])),
+                "slowest": [run for _, _, run in sorted(self._slowest, reverse=True)],
+            }
+
+
+recorder = TelemetryRecorder()
+
+_captured: ContextVar[Optional[List[TMRunStats]]] = ContextVar("tm_telemetry_captured", default=None)
+
+
+def record(stats: TMRunStats) -> None:
+    recorder.record(stats)
+
+    captured = _captured.get()
+    if captured is not None:
+        captured.append(stats)
+
+
+@contextmanager
+def capture() -> Iterator[List[TMRunStats]]:
+    """Collect the runs recorded inside the block, in addition to the global aggregate."""
+    captured: List[TMRunStats] = []
+    token = _captured.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured.reset(token)
+
+
+def trace_dtm(machine: str, dtm, tape_input, input_bytes: int):
+    """Run an automata-lib ``DTM`` step by step, record its stats and return the final configuration."""
+    stats = TMRunStats(machine=machine, input_bytes=input_bytes)
+    visits = stats.state_visits
+
+    started = time.perf_counter()
+    configuration = None
+    for configuration in dtm.read_input_stepwise(tape_input):
+        stats.steps += 1
+        visits[configuration.state] = visits.get(configuration.state, 0) + 1
+    stats.wall_time = time.perf_counter() - started
+
+    # The stepwise run also yields the halting configuration, which is not a step.
+    stats.steps -= 1
+    visits[configuration.state] -= 1
+    if not visits[configuration.state]:
+        del visits[configuration.state]
+    stats.macro_steps = stats.steps
+    stats.max_tape_length = len(configuration.tape)
+
+    record(stats)
+    return configuration
@@ -1,13 +1,27 @@
-from typing import TypedDict, List, NotRequired, Dict
+from typing import Any, TypedDict, List, NotRequired, Dict, Union
 
 from type_defs.json_types import JsonObject, ValidationErrors
-from utils.json.json_grammar import DerivationResult
+from utils.json.json_grammar import DerivationResult, DeltaDerivationResult
+
+
+class TMRunTelemetry(TypedDict):
+    machine: str
+    input_bytes: int
+    steps: int
+    macro_steps: int
+    max_tape_length: int
+    wall_time: float
+    state_visits: Dict[str, int]
+
+
+SegmentTelemetry = Dict[str, List[TMRunTelemetry]]
 
 
 class TokenComponents(TypedDict):
     header: str
     payload: str
     signature: str
+    telemetry: NotRequired[SegmentTelemetry]
 
 
 class TokenCreationResult(TypedDict):
@@ -32,10 +46,17 @@ class DecodedComponents(TypedDict):
     payload: str
 
 
+class LimitExceeded(TypedDict):
+    limit: str
+    max: int
+    segment: NotRequired[str]
+
+
 class LexicalAnalysisResult(TypedDict):
     errors: List[str]
     segments: NotRequired[TokenSegments]
     decoded: NotRequired[DecodedComponents]
+    limit_exceeded: NotRequired[LimitExceeded]
 
 
 class JsonComponentError(TypedDict):
@@ -49,7 +70,8 @@ class JsonComponentError(TypedDict):
 class SyntacticComponentAnalysisResult(TypedDict):
     parsed: NotRequired[JsonObject]
     error: NotRequired[JsonComponentError]
-    derivation: NotRequired[DerivationResult]
+    derivation: NotRequired[Union[DerivationResult, DeltaDerivationResult]]
+    limit_exceeded: NotRequired[LimitExceeded]
 
 
 class SyntacticAnalysisResult(TypedDict):
@@ -85,6 +107,43 @@ class AnalyzeTokenResult(TypedDict):
     cryptographic: NotRequired[bool]
 
 
+class BatchItemError(TypedDict):
+    message: str
+    details: NotRequired[ValidationErrors]
+
+
+class BatchAnalysisItem(TypedDict):
+    index: int
+    result: NotRequired[AnalyzeTokenResult]
+    error: NotRequired[BatchItemError]
+
+
+class BatchStageRecord(TypedDict):
+    index: int
+    stage: NotRequired[str]
+    data: NotRequired[Any]
+    error: NotRequired[BatchItemError]
+
+
+class BatchBuildItem(TypedDict):
+    index: int
+    result: NotRequired[TokenCreationResult]
+    error: NotRequired[BatchItemError]
+
+
+class SecretAuditProgress(TypedDict):
+    event: str
+    tested: int
+    elapsed: float
+    candidates_per_second: float
+
+
+class SecretAuditResult(SecretAuditProgress):
+    found: bool
+    stop_reason: str
+    secret: NotRequired[str]
+
+
 class TokenTestCase(TypedDict):
     token: str
     description: str
@@ -1,7 +1,88 @@
 import base64
-from typing import Union
+import binascii
+import logging
+import os
+import random
+import string
+from typing import Callable, Dict, Optional, Union
 
-from turing_machine.b64_encode import b64_encode_tm
+from turing_machine import telemetry
+from turing_machine.chunked import encode_chunked
+from turing_machine.loader import get_tm
+from turing_machine.tape_io import BitTapeInput
+
+logger = logging.getLogger(__name__)
+
+_TM_CHUNK_SIZE = int(os.getenv("B64_TM_CHUNK_SIZE", "12"))
+_TM_PARALLEL_THRESHOLD = int(os.getenv("B64_TM_PARALLEL_THRESHOLD", "65536"))
+_TM_MAX_WORKERS = int(os.getenv("B64_TM_MAX_WORKERS", "0")) or None
+
+
+# Every backend returns unpadded base64url. The machine backends use the
+# url-safe machine, which writes "-"/"_" itself and never writes padding.
+def _encode_turing(data: bytes) -> bytes:
+    machine = get_tm("b64url_encode")
+    if telemetry.ENABLED:
+        tape = telemetry.trace_dtm("b64url_encode", machine, BitTapeInput(data), len(data)).tape
+    else:
+        tape = machine.read_input(BitTapeInput(data)).tape
+    return tape.get_symbols_as_str().replace(tape.blank_symbol, "").encode('ascii')
+
+
+def _encode_compiled_turing(data: bytes) -> bytes:
+    return encode_chunked(
+        data,
+        chunk_size=_TM_CHUNK_SIZE,
+        parallel_threshold=_TM_PARALLEL_THRESHOLD,
+        max_workers=_TM_MAX_WORKERS,
+        machine="b64url_encode"
+    )
+
+
+def _encode_native(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+ENCODER_BACKENDS: Dict[str, Callable[[bytes], bytes]] = {
+    "turing": _encode_turing,
+    "compiled-turing": _encode_compiled_turing,
+    "native": _encode_native,
+}
+
+
+def _get_backend(env_var: str, default: str) -> str:
+    name = os.getenv(env_var, default).strip().lower()
+    if name not in ENCODER_BACKENDS:
+        raise ValueError(
+            f"{env_var} must be one of: {', '.join(ENCODER_BACKENDS)} (got '{name}')"
+        )
+    return name
+
+
+ENCODER_BACKEND = _get_backend("B64_ENCODER_BACKEND", "compiled-turing")
+VERIFY_BACKEND = _get_backend("B64_VERIFY_BACKEND", "compiled-turing")
+VERIFY_RATE = float(os.getenv("B64_VERIFY_RATE", "0"))
+
+_encode = ENCODER_BACKENDS[ENCODER_BACKEND]
+
+
+def _encode_verified(data: bytes) -> bytes:
+    if ENCODER_BACKEND == "native":
+        native_output = _encode(data)
+        machine_backend = VERIFY_BACKEND
+        machine_output = ENCODER_BACKENDS[VERIFY_BACKEND](data)
+    else:
+        machine_output = _encode(data)
+        machine_backend = ENCODER_BACKEND
+        native_output = _encode_native(data)
+
+    if machine_output != native_output:
+        logger.error(
+            "Base64 backend '%s' disagrees with the native encoder for an input of %d bytes",
+            machine_backend, len(data)
+        )
+
+    return native_output
 
 
 def encode_base64_url(data: Union[str, bytes]) -> str:
@@ -10,10 +91,10 @@ def encode_base64_url(data: Union[str, bytes]) -> str:
     else:
         data_bytes = data
 
-    bits = ''.join(f'{byte:08b}' for byte in data_bytes)
-    b64_standard = b64_encode_tm.read_input(bits).tape.get_symbols_as_str().replace("_", "")
-    b64_url = b64_standard.replace("+", "-").replace("/", "_").rstrip("=")
-    return b64_url
+    if VERIFY_RATE > 0 and random.random() < VERIFY_RATE:
+        return _encode_verified(data_bytes).decode('ascii')
+
+    return _encode(data_bytes).decode('ascii')
 
 
 def decode_base64_url(encoded_data: str) -> str:
@@ -27,6 +108,41 @@ def decode_base64_url(encoded_data: str) -> str:
         raise ValueError(f"Invalid base64 URL-encoded data: {e}")
 
 
+_BASE64URL_ALPHABET = (string.ascii_letters + string.digits + "-_").encode('ascii')
+_TO_STANDARD_ALPHABET = bytes.maketrans(b"-_", b"+/")
+
+
+def base64url_to_standard(text: str, separators: bytes = b".") -> Optional[bytes]:
+    """
+    Return ``text`` as ASCII bytes with "-"/"_" mapped to "+"/"/", ready to be
+    decoded piece by piece with ``decode_base64_unpadded``. Returns None when
+    ``text`` holds anything besides the base64url alphabet and ``separators``.
+    """
+    if not text.isascii():
+        return None
+
+    raw = text.encode('ascii')
+    if raw.translate(None, _BASE64URL_ALPHABET + separators):
+        return None
+    return raw.translate(_TO_STANDARD_ALPHABET)
+
+
+def decode_base64_unpadded(data: memoryview) -> str:
+    """
+    Decode unpadded standard base64 as UTF-8, like ``decode_base64_url`` does
+    once the alphabet is mapped. Only the last, partial quantum is copied to
+    pad it.
+    """
+    try:
+        remainder = len(data) % 4
+        decoded = binascii.a2b_base64(data[:len(data) - remainder])
+        if remainder:
+            decoded += binascii.a2b_base64(bytes(data[len(data) - remainder:]) + b"=" * (4 - remainder))
+        return str(decoded, 'utf-8')
+    except Exception as e:
+        raise ValueError(f"Invalid base64 URL-encoded data: {e}")
+
+
 def _add_padding(encoded_data: str) -> str:
     padding = 4 - (len(encoded_data) % 4)
     if padding != 4:
@@ -34,4 +150,4 @@ def _add_padding(encoded_data: str) -> str:
     return encoded_data
 
 
-__all__ = ['encode_base64_url', 'decode_base64_url']
+__all__ = ['encode_base64_url', 'decode_base64_url', 'base64url_to_standard', 'decode_base64_unpadded']
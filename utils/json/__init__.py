@@ -1,4 +1,4 @@
-from .json_parse import parse_json
-from .json_grammar import analyze_json_grammar
+from .json_parse import parse_json, parse_json_tree
+from .json_grammar import analyze_json_grammar, analyze_json_tree
 
-__all__ = ["parse_json", "analyze_json_grammar"]
+__all__ = ["parse_json", "parse_json_tree", "analyze_json_grammar", "analyze_json_tree"]
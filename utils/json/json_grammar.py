@@ -1,10 +1,23 @@
-from typing import List, Optional, Union
+import hashlib
+import pprint
+import re
+from itertools import chain, islice
+from pathlib import Path
+from json.decoder import scanstring
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
-from anytree import Node, RenderTree
-from lark import Lark, Tree, Token
+import lark
+from lark import Lark, Transformer, Tree, Token
+from lark.grammar import Rule
+from lark.lexer import TerminalDef
 
+from utils.json import json_grammar_tables
 
-__all__ = ['analyze_json_grammar', 'DerivationResult', 'DerivationStep', 'Production']
+
+__all__ = ['analyze_json_grammar', 'DerivationResult', 'DerivationStep', 'Production',
+           'DeltaDerivationResult', 'DeltaDerivationStep', 'DERIVATION_FORMATS',
+           'JsonValueTree', 'parse_json_grammar', 'analyze_json_tree',
+           'iter_derivation_steps', 'iter_derivation_deltas', 'count_tree_nodes']
 
 
 @dataclass(frozen=True)
@@ -37,6 +50,41 @@ class DerivationResult:
         return "\n".join(lines)
 
 
+@dataclass(frozen=True)
+class DeltaDerivationStep:
+    """
+    A derivation step as an edit of the previous sentential form: the symbol
+    at ``position`` (counted in symbols, not characters) is replaced by
+    ``replacement``. ``position`` is None when the production matched no
+    symbol and the form did not change.
+    """
+    production: Production
+    position: Optional[int]
+    replacement: List[str]
+
+
+@dataclass(frozen=True)
+class DeltaDerivationResult:
+    tree: str
+    start: str
+    steps: List[DeltaDerivationStep]
+
+    def expand(self) -> DerivationResult:
+        """Rebuild the full sentential form of every step."""
+        form = [self.start]
+        steps = []
+
+        for step in self.steps:
+            if step.position is not None:
+                form[step.position:step.position + 1] = step.replacement
+            steps.append(DerivationStep(step.production, " ".join(form)))
+
+        return DerivationResult(tree=self.tree, steps=steps)
+
+
+DERIVATION_FORMATS = ("expanded", "delta")
+
+
 _JSON_GRAMMAR = r"""
 object        : LBRACE members_opt RBRACE
 members_opt   : members?
@@ -78,50 +126,206 @@ NULL          : "null"
 
 _EPSILON = "ε"
 
-_parser = Lark(_JSON_GRAMMAR, start="object", parser="lalr")
+_TREE_PIPE = "│   "
+_TREE_SPACE = "    "
+_TREE_BRANCH = "├── "
+_TREE_END = "└── "
+
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+
+
+class JsonValueTree(Tree):
+    """A parse tree node that also carries the Python value of the JSON it matched."""
+
+    def __init__(self, data: str, children: List[Union[Tree, Token]], value: Any = None):
+        super().__init__(data, children)
+        self.value = value
+
+
+class _JsonValueBuilder(Transformer):
+    """
+    Parser callbacks that build each value node together with its Python value,
+    following ``json.loads``. The grammar is looser than JSON for numbers and
+    string escapes, so those tokens are checked here and raise ValueError.
+    """
+
+    def object(self, children):
+        value = {}
+        members = _first_child(children[1])
+        while members is not None:
+            key, _, item = members.children[0].children
+            value[key.value] = item.value
+            members = members.children[2] if len(members.children) == 3 else None
+        return JsonValueTree("object", children, value)
+
+    def array(self, children):
+        value = []
+        elements = _first_child(children[1])
+        while elements is not None:
+            value.append(elements.children[0].value)
+            elements = elements.children[2] if len(elements.children) == 3 else None
+        return JsonValueTree("array", children, value)
+
+    def value(self, children):
+        return JsonValueTree("value", children, children[0].value)
+
+    def key(self, children):
+        return JsonValueTree("key", children, _decode_string(children[0]))
+
+    def string(self, children):
+        return JsonValueTree("string", children, _decode_string(children[0]))
+
+    def number(self, children):
+        token = children[0]
+        match = _NUMBER_RE.fullmatch(token)
+        if match is None:
+            raise ValueError(f"Invalid number: {token}")
+        return JsonValueTree("number", children, float(token) if match.lastindex else int(token))
+
+    def boolean(self, children):
+        return JsonValueTree("boolean", children, children[0] == "true")
+
+    def null(self, children):
+        return JsonValueTree("null", children, None)
+
+
+def _first_child(node: Tree) -> Optional[Tree]:
+    return node.children[0] if node.children else None
+
+
+def _decode_string(token: Token) -> str:
+    value, end = scanstring(token, 1)
+    if end != len(token):
+        raise ValueError(f"Invalid string: {token}")
+    return value
 
 
-def analyze_json_grammar(json_string: str) -> DerivationResult:
-    lark_tree = _parser.parse(json_string)
-    anytree_root = _lark_to_anytree(lark_tree)
+def grammar_hash() -> str:
+    return hashlib.sha256(_JSON_GRAMMAR.encode("utf-8")).hexdigest()
+
+
+def _load_parser() -> Lark:
+    """
+    Build the LALR parser from the tables in ``json_grammar_tables``, which
+    are generated from ``_JSON_GRAMMAR`` by ``write_parser_tables`` and kept
+    under version control, so nothing is read from a writable cache. Tables
+    generated for another grammar or Lark version are ignored and the parser
+    is built from the grammar.
+    """
+    options = dict(transformer=_JsonValueBuilder())
+    if json_grammar_tables.GRAMMAR_SHA256 == grammar_hash() and json_grammar_tables.LARK_VERSION == lark.__version__:
+        return Lark._load_from_dict(json_grammar_tables.DATA, json_grammar_tables.MEMO, **options)
+    return Lark(_JSON_GRAMMAR, start="object", parser="lalr", **options)
+
+
+def write_parser_tables(path: Path = Path(__file__).with_name("json_grammar_tables.py")) -> None:
+    """
+    Regenerate ``json_grammar_tables`` after editing ``_JSON_GRAMMAR``:
+
+        python -c "from utils.json.json_grammar import write_parser_tables; write_parser_tables()"
+    """
+    data, memo = Lark(_JSON_GRAMMAR, start="object", parser="lalr").memo_serialize([TerminalDef, Rule])
+    path.write_text(
+        '"""LALR tables of ``json_grammar._JSON_GRAMMAR``, generated by ``write_parser_tables``. Do not edit."""\n\n'
+        f"GRAMMAR_SHA256 = {grammar_hash()!r}\n"
+        f"LARK_VERSION = {lark.__version__!r}\n\n"
+        f"DATA = {pprint.pformat(data, width=120)}\n\n"
+        f"MEMO = {pprint.pformat(memo, width=120)}\n",
+        encoding="utf-8"
+    )
+
+
+_parser = _load_parser()
+
+
+def parse_json_grammar(json_string: str) -> JsonValueTree:
+    """
+    Parse ``json_string`` once, returning its parse tree; ``tree.value`` is
+    the decoded object. Raises a ``LarkError`` when the text does not match
+    the grammar and ValueError when a token is not valid JSON.
+    """
+    return _parser.parse(json_string)
+
+
+def analyze_json_grammar(json_string: str,
+                         derivation_format: str = "expanded") -> Union[DerivationResult, DeltaDerivationResult]:
+    return analyze_json_tree(parse_json_grammar(json_string), derivation_format)
+
+
+def analyze_json_tree(lark_tree: Tree, derivation_format: str = "expanded",
+                      max_steps: Optional[int] = None) -> Union[DerivationResult, DeltaDerivationResult]:
+    """With ``max_steps``, the derivation stops after that many steps."""
+    if derivation_format == "delta":
+        return DeltaDerivationResult(
+            tree=_format_tree(lark_tree),
+            start=lark_tree.data,
+            steps=list(islice(iter_derivation_deltas(lark_tree), max_steps))
+        )
 
     return DerivationResult(
-        tree=_format_tree(anytree_root),
-        steps=_trace_derivation(lark_tree)
+        tree=_format_tree(lark_tree),
+        steps=list(islice(iter_derivation_steps(lark_tree), max_steps))
     )
 
 
-def _format_tree(root: Node) -> str:
-    lines = []
-    for pre, _, node in RenderTree(root):
-        lines.append(f"{pre}{node.name}")
+def count_tree_nodes(lark_tree: Tree) -> Tuple[int, int]:
+    """
+    Return the number of rule nodes and of tokens in ``lark_tree``. The
+    derivation has one step per rule node and the rendered tree one line per
+    node of either kind.
+    """
+    rules = tokens = 0
+    for node in _iter_preorder([lark_tree]):
+        rules += 1
+        tokens += sum(1 for child in node.children if isinstance(child, Token))
+    return rules, tokens
+
+
+def _format_tree(root: Tree) -> str:
+    """Render ``root`` with box-drawing guides, one node per line, in pre-order."""
+    lines = [str(root.data)]
+    # (children, next child index, guide prefix for those children)
+    stack = [(_tree_children(root), 0, "")]
+
+    while stack:
+        children, index, prefix = stack[-1]
+        if index == len(children):
+            stack.pop()
+            continue
+        stack[-1] = (children, index + 1, prefix)
+
+        child = children[index]
+        last = index == len(children) - 1
+        if isinstance(child, Tree):
+            lines.append(f"{prefix}{_TREE_END if last else _TREE_BRANCH}{child.data}")
+            stack.append((_tree_children(child), 0, prefix + (_TREE_SPACE if last else _TREE_PIPE)))
+        else:
+            lines.append(f"{prefix}{_TREE_END if last else _TREE_BRANCH}{child}")
+
     return "\n".join(lines)
 
 
-def _lark_to_anytree(lark_node: Union[Tree, Token]) -> Optional[Node]:
-    if isinstance(lark_node, Tree):
-        node = Node(lark_node.data)
-        for child in lark_node.children:
-            child_node = _lark_to_anytree(child)
-            if child_node is not None:
-                child_node.parent = node
-        return node
-    elif isinstance(lark_node, Token):
-        return Node(str(lark_node))
-    return None
+def _tree_children(node: Tree) -> List[Union[Tree, Token]]:
+    return [child for child in node.children if isinstance(child, (Tree, Token))]
 
 
-def _get_grammar_rules(tree: Tree) -> List[Production]:
-    productions = []
-    _collect_productions(tree, productions)
-    return productions
+def iter_derivation_steps(tree: Tree) -> Iterator[DerivationStep]:
+    """Yield the leftmost derivation of ``tree`` one step at a time."""
+    form = _SententialForm(tree)
+    for delta in form.derive():
+        yield DerivationStep(delta.production, form.text())
 
 
-def _collect_productions(node: Tree, productions: List[Production]) -> None:
-    if not isinstance(node, Tree):
-        return
+def iter_derivation_deltas(tree: Tree) -> Iterator[DeltaDerivationStep]:
+    """Like ``iter_derivation_steps``, but without building the sentential forms."""
+    return _SententialForm(tree).derive()
 
-    source = node.data
+
+def _trace_derivation(tree: Tree) -> List[DerivationStep]:
+    return list(iter_derivation_steps(tree))
+
+
+def _production(node: Tree) -> Production:
     target_parts = []
 
     for child in node.children:
@@ -131,32 +335,97 @@ def _collect_productions(node: Tree, productions: List[Production]) -> None:
             target_parts.append(str(child))
 
     right_side = " ".join(target_parts) if target_parts else _EPSILON
-    productions.append(Production(source, right_side))
-
-    for child in node.children:
-        if isinstance(child, Tree):
-            _collect_productions(child, productions)
-
-
-def _trace_derivation(tree: Tree) -> List[DerivationStep]:
-    steps = []
-    current_string = [tree.data]
-
-    productions = _get_grammar_rules(tree)
-
-    for prod in productions:
-        new_string = []
-        replaced = False
-
-        for symbol in current_string:
-            if symbol == prod.source and not replaced:
-                if prod.target != _EPSILON:
-                    new_string.extend(prod.target.split())
-                replaced = True
+    return Production(node.data, right_side)
+
+
+def _replacement(production: Production) -> List[str]:
+    return production.target.split() if production.target != _EPSILON else []
+
+
+def _iter_preorder(roots: Iterable[Tree]) -> Iterator[Tree]:
+    stack = list(roots)
+    stack.reverse()
+
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(child for child in reversed(node.children) if isinstance(child, Tree))
+
+
+class _SententialForm:
+    """
+    The sentential form of a leftmost derivation, split at the leftmost
+    nonterminal: the symbols already derived are kept in ``_prefix`` and the
+    rest in ``_suffix``, reversed, so the cursor is the end of the stack and
+    each production is applied in O(1).
+
+    Productions replace the first symbol equal to their source, so a terminal
+    that spells a rule name (``null -> null``, or a word of a string with
+    spaces) is replaced instead of the nonterminal. ``_prefix_counts`` detects
+    that case, after which the derivation continues by searching a plain list
+    to keep the same output.
+    """
+
+    def __init__(self, tree: Tree):
+        self._prefix: List[str] = []
+        self._prefix_counts: Dict[str, int] = {}
+        self._suffix: List[str] = [tree.data]
+        self._nodes: List[Optional[Tree]] = [tree]
+
+    def derive(self) -> Iterator[DeltaDerivationStep]:
+        """Apply the productions of the tree in pre-order, yielding each edit after it is applied."""
+        while self._advance():
+            node = self._nodes[-1]
+            production = _production(node)
+
+            # Replacing an earlier ``null`` with ``null`` leaves the same symbols.
+            if self._prefix_counts.get(node.data) and production.target != production.source:
+                yield from self._derive_by_search()
+                return
+
+            position = len(self._prefix)
+            self._suffix.pop()
+            self._nodes.pop()
+            for child in reversed(node.children):
+                if isinstance(child, Tree):
+                    self._suffix.append(child.data)
+                    self._nodes.append(child)
+                else:
+                    for symbol in reversed(str(child).split()):
+                        self._suffix.append(symbol)
+                        self._nodes.append(None)
+
+            yield DeltaDerivationStep(production, position, _replacement(production))
+
+    def text(self) -> str:
+        return " ".join(chain(self._prefix, reversed(self._suffix)))
+
+    def _advance(self) -> bool:
+        """Move terminals from the top of the stack into the prefix, stopping at the next nonterminal."""
+        suffix, nodes, counts = self._suffix, self._nodes, self._prefix_counts
+
+        while nodes and nodes[-1] is None:
+            symbol = suffix.pop()
+            nodes.pop()
+            self._prefix.append(symbol)
+            counts[symbol] = counts.get(symbol, 0) + 1
+
+        return bool(nodes)
+
+    def _derive_by_search(self) -> Iterator[DeltaDerivationStep]:
+        remaining = [node for node in reversed(self._nodes) if node is not None]
+        self._prefix.extend(reversed(self._suffix))
+        self._suffix.clear()
+        self._nodes.clear()
+
+        form = self._prefix
+        for node in _iter_preorder(remaining):
+            production = _production(node)
+            replacement = _replacement(production)
+            try:
+                index = form.index(production.source)
+            except ValueError:
+                yield DeltaDerivationStep(production, None, [])
             else:
-                new_string.append(symbol)
-
-        current_string = new_string
-        steps.append(DerivationStep(prod, " ".join(current_string)))
-
-    return steps
+                form[index:index + 1] = replacement
+                yield DeltaDerivationStep(production, index, replacement)
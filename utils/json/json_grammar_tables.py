@@ -0,0 +1,535 @@
+"""LALR tables of ``json_grammar._JSON_GRAMMAR``, generated by ``write_parser_tables``. Do not edit."""
+
+GRAMMAR_SHA256 = 'c3a673d22b2f2acf4b02cf0ed09c4d59bb964b36b56b888422c986f2e2a0c2f3'
+LARK_VERSION = '0.12.0'
+
+DATA = {'__type__': 'Lark',
+ 'options': {'ambiguity': 'auto',
+             'cache': False,
+             'debug': False,
+             'edit_terminals': None,
+             'g_regex_flags': 0,
+             'import_paths': [],
+             'keep_all_tokens': False,
+             'lexer': 'contextual',
+             'lexer_callbacks': {},
+             'maybe_placeholders': False,
+             'parser': 'lalr',
+             'postlex': None,
+             'priority': 'normal',
+             'propagate_positions': False,
+             'regex': False,
+             'source_path': None,
+             'start': ['object'],
+             'transformer': None,
+             'tree_class': None,
+             'use_bytes': False},
+ 'parser': {'__type__': 'ParsingFrontend',
+            'lexer_conf': {'__type__': 'LexerConf',
+                           'g_regex_flags': 0,
+                           'ignore': ['WS'],
+                           'lexer_type': 'contextual',
+                           'terminals': [{'@': 0},
+                                         {'@': 1},
+                                         {'@': 2},
+                                         {'@': 3},
+                                         {'@': 4},
+                                         {'@': 5},
+                                         {'@': 6},
+                                         {'@': 7},
+                                         {'@': 8},
+                                         {'@': 9},
+                                         {'@': 10},
+                                         {'@': 11}],
+                           'use_bytes': False},
+            'options': {'ambiguity': 'auto',
+                        'cache': False,
+                        'debug': False,
+                        'edit_terminals': None,
+                        'g_regex_flags': 0,
+                        'import_paths': [],
+                        'keep_all_tokens': False,
+                        'lexer': 'contextual',
+                        'lexer_callbacks': {},
+                        'maybe_placeholders': False,
+                        'parser': 'lalr',
+                        'postlex': None,
+                        'priority': 'normal',
+                        'propagate_positions': False,
+                        'regex': False,
+                        'source_path': None,
+                        'start': ['object'],
+                        'transformer': None,
+                        'tree_class': None,
+                        'use_bytes': False},
+            'parser': {'end_states': {'object': 7},
+                       'start_states': {'object': 3},
+                       'states': {0: {0: (1, {'@': 21}), 1: (1, {'@': 21}), 2: (1, {'@': 21})},
+                                  1: {1: (0, 8)},
+                                  2: {1: (1, {'@': 13})},
+                                  3: {3: (0, 28), 4: (0, 7)},
+                                  4: {5: (0, 27), 6: (0, 30), 7: (0, 25), 8: (0, 18)},
+                                  5: {0: (1, {'@': 22}), 1: (1, {'@': 22}), 2: (1, {'@': 22})},
+                                  6: {0: (1, {'@': 19}), 1: (1, {'@': 19}), 2: (1, {'@': 19})},
+                                  7: {},
+                                  8: {0: (1, {'@': 12}), 1: (1, {'@': 12}), 2: (1, {'@': 12}), 9: (1, {'@': 12})},
+                                  9: {0: (1, {'@': 29}), 1: (1, {'@': 29}), 2: (1, {'@': 29})},
+                                  10: {2: (1, {'@': 27})},
+                                  11: {0: (1, {'@': 23}), 1: (1, {'@': 23}), 2: (1, {'@': 23})},
+                                  12: {3: (0, 28),
+                                       4: (0, 13),
+                                       6: (0, 9),
+                                       10: (0, 5),
+                                       11: (0, 0),
+                                       12: (0, 6),
+                                       13: (0, 14),
+                                       14: (0, 19),
+                                       15: (0, 26),
+                                       16: (0, 20),
+                                       17: (0, 16),
+                                       18: (0, 23),
+                                       19: (0, 11),
+                                       20: (0, 29)},
+                                  13: {0: (1, {'@': 20}), 1: (1, {'@': 20}), 2: (1, {'@': 20})},
+                                  14: {0: (1, {'@': 33}), 1: (1, {'@': 33}), 2: (1, {'@': 33})},
+                                  15: {0: (1, {'@': 24}), 1: (1, {'@': 24}), 2: (1, {'@': 24})},
+                                  16: {0: (1, {'@': 17}), 1: (1, {'@': 17})},
+                                  17: {2: (1, {'@': 25})},
+                                  18: {21: (0, 12)},
+                                  19: {0: (1, {'@': 18}), 1: (1, {'@': 18}), 2: (1, {'@': 18})},
+                                  20: {2: (1, {'@': 26}),
+                                       3: (0, 28),
+                                       4: (0, 13),
+                                       6: (0, 9),
+                                       10: (0, 5),
+                                       11: (0, 0),
+                                       12: (0, 6),
+                                       13: (0, 14),
+                                       14: (0, 19),
+                                       15: (0, 26),
+                                       16: (0, 20),
+                                       17: (0, 21),
+                                       18: (0, 23),
+                                       19: (0, 11),
+                                       20: (0, 29),
+                                       22: (0, 22),
+                                       23: (0, 17)},
+                                  21: {0: (0, 24), 2: (1, {'@': 28})},
+                                  22: {2: (0, 15)},
+                                  23: {0: (1, {'@': 30}), 1: (1, {'@': 30}), 2: (1, {'@': 30})},
+                                  24: {3: (0, 28),
+                                       4: (0, 13),
+                                       6: (0, 9),
+                                       10: (0, 5),
+                                       11: (0, 0),
+                                       12: (0, 6),
+                                       13: (0, 14),
+                                       14: (0, 19),
+                                       15: (0, 26),
+                                       16: (0, 20),
+                                       17: (0, 21),
+                                       18: (0, 23),
+                                       19: (0, 11),
+                                       20: (0, 29),
+                                       23: (0, 10)},
+                                  25: {1: (1, {'@': 15})},
+                                  26: {0: (1, {'@': 32}), 1: (1, {'@': 32}), 2: (1, {'@': 32})},
+                                  27: {0: (0, 4), 1: (1, {'@': 16})},
+                                  28: {1: (1, {'@': 14}), 5: (0, 27), 6: (0, 30), 7: (0, 2), 8: (0, 18), 24: (0, 1)},
+                                  29: {0: (1, {'@': 31}), 1: (1, {'@': 31}), 2: (1, {'@': 31})},
+                                  30: {21: (1, {'@': 34})}},
+                       'tokens': {0: 'COMMA',
+                                  1: 'RBRACE',
+                                  2: 'RBRACK',
+                                  3: 'LBRACE',
+                                  4: 'object',
+                                  5: 'pair',
+                                  6: 'ESCAPED_STRING',
+                                  7: 'members',
+                                  8: 'key',
+                                  9: '$END',
+                                  10: 'boolean',
+                                  11: 'array',
+                                  12: 'number',
+                                  13: 'NULL',
+                                  14: 'string',
+                                  15: 'FALSE',
+                                  16: 'LBRACK',
+                                  17: 'value',
+                                  18: 'SIGNED_NUMBER',
+                                  19: 'null',
+                                  20: 'TRUE',
+                                  21: 'COLON',
+                                  22: 'elements_opt',
+                                  23: 'elements',
+                                  24: 'members_opt'}},
+            'parser_conf': {'__type__': 'ParserConf',
+                            'parser_type': 'lalr',
+                            'rules': [{'@': 12},
+                                      {'@': 13},
+                                      {'@': 14},
+                                      {'@': 15},
+                                      {'@': 16},
+                                      {'@': 17},
+                                      {'@': 18},
+                                      {'@': 19},
+                                      {'@': 20},
+                                      {'@': 21},
+                                      {'@': 22},
+                                      {'@': 23},
+                                      {'@': 24},
+                                      {'@': 25},
+                                      {'@': 26},
+                                      {'@': 27},
+                                      {'@': 28},
+                                      {'@': 29},
+                                      {'@': 30},
+                                      {'@': 31},
+                                      {'@': 32},
+                                      {'@': 33},
+                                      {'@': 34}],
+                            'start': ['object']}},
+ 'rules': [{'@': 12},
+           {'@': 13},
+           {'@': 14},
+           {'@': 15},
+           {'@': 16},
+           {'@': 17},
+           {'@': 18},
+           {'@': 19},
+           {'@': 20},
+           {'@': 21},
+           {'@': 22},
+           {'@': 23},
+           {'@': 24},
+           {'@': 25},
+           {'@': 26},
+           {'@': 27},
+           {'@': 28},
+           {'@': 29},
+           {'@': 30},
+           {'@': 31},
+           {'@': 32},
+           {'@': 33},
+           {'@': 34}]}
+
+MEMO = {0: {'__type__': 'TerminalDef',
+     'name': 'SIGNED_NUMBER',
+     'pattern': {'__type__': 'PatternRE',
+                 '_width': [1, 18446744073709551616],
+                 'flags': [],
+                 'value': '(?:(?:\\+|\\-))?(?:(?:(?:[0-9])+(?:e|E)(?:(?:\\+|\\-))?(?:[0-9])+|(?:(?:[0-9])+\\.(?:(?:[0-9])+)?|\\.(?:[0-9])+)(?:(?:e|E)(?:(?:\\+|\\-))?(?:[0-9])+)?)|(?:[0-9])+)'},
+     'priority': 1},
+ 1: {'__type__': 'TerminalDef',
+     'name': 'ESCAPED_STRING',
+     'pattern': {'__type__': 'PatternRE',
+                 '_width': [2, 18446744073709551616],
+                 'flags': [],
+                 'value': '".*?(?<!\\\\)(\\\\\\\\)*?"'},
+     'priority': 1},
+ 2: {'__type__': 'TerminalDef',
+     'name': 'WS',
+     'pattern': {'__type__': 'PatternRE',
+                 '_width': [1, 18446744073709551616],
+                 'flags': [],
+                 'value': '(?:[ \t\x0c\r\n])+'},
+     'priority': 1},
+ 3: {'__type__': 'TerminalDef',
+     'name': 'LBRACE',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': '{'},
+     'priority': 1},
+ 4: {'__type__': 'TerminalDef',
+     'name': 'RBRACE',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': '}'},
+     'priority': 1},
+ 5: {'__type__': 'TerminalDef',
+     'name': 'LBRACK',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': '['},
+     'priority': 1},
+ 6: {'__type__': 'TerminalDef',
+     'name': 'RBRACK',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': ']'},
+     'priority': 1},
+ 7: {'__type__': 'TerminalDef',
+     'name': 'COLON',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': ':'},
+     'priority': 1},
+ 8: {'__type__': 'TerminalDef',
+     'name': 'COMMA',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': ','},
+     'priority': 1},
+ 9: {'__type__': 'TerminalDef',
+     'name': 'TRUE',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': 'true'},
+     'priority': 1},
+ 10: {'__type__': 'TerminalDef',
+      'name': 'FALSE',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': 'false'},
+      'priority': 1},
+ 11: {'__type__': 'TerminalDef',
+      'name': 'NULL',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'value': 'null'},
+      'priority': 1},
+ 12: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'LBRACE'},
+                    {'__type__': 'NonTerminal', 'name': 'members_opt'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'RBRACE'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'object'}},
+ 13: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'members'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'members_opt'}},
+ 14: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'members_opt'}},
+ 15: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'pair'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'COMMA'},
+                    {'__type__': 'NonTerminal', 'name': 'members'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'members'}},
+ 16: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'pair'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'members'}},
+ 17: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'key'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'value'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'pair'}},
+ 18: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'string'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'value'}},
+ 19: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'number'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'value'}},
+ 20: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'object'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'value'}},
+ 21: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'array'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 3,
+      'origin': {'__type__': 'NonTerminal', 'name': 'value'}},
+ 22: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'boolean'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 4,
+      'origin': {'__type__': 'NonTerminal', 'name': 'value'}},
+ 23: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'null'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 5,
+      'origin': {'__type__': 'NonTerminal', 'name': 'value'}},
+ 24: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'LBRACK'},
+                    {'__type__': 'NonTerminal', 'name': 'elements_opt'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'RBRACK'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'array'}},
+ 25: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'elements'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'elements_opt'}},
+ 26: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'elements_opt'}},
+ 27: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'value'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'COMMA'},
+                    {'__type__': 'NonTerminal', 'name': 'elements'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'elements'}},
+ 28: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'value'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'elements'}},
+ 29: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'ESCAPED_STRING'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'string'}},
+ 30: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'SIGNED_NUMBER'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'number'}},
+ 31: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'TRUE'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'boolean'}},
+ 32: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'FALSE'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'boolean'}},
+ 33: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'NULL'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'null'}},
+ 34: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'ESCAPED_STRING'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'key'}}}
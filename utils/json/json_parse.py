@@ -1,8 +1,13 @@
 import json
+import re
 from dataclasses import dataclass, asdict
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Tuple
 
-__all__ = ["JsonParseError", "JsonParseResult", "parse_json"]
+from lark.exceptions import LarkError, UnexpectedInput
+
+from .json_grammar import JsonValueTree, parse_json_grammar
+
+__all__ = ["JsonParseError", "JsonParseResult", "parse_json", "parse_json_tree", "json_nesting_depth"]
 
 
 @dataclass(frozen=True)
@@ -55,6 +60,9 @@ _ERROR_TRANSLATIONS = {
 }
 
 
+_GRAMMAR_ERROR_MESSAGE = "Valor no permitido por la gramática JSON"
+
+
 def _translate_error_message(original_message: str) -> str:
     for english, spanish in _ERROR_TRANSLATIONS.items():
         if original_message.startswith(english):
@@ -123,3 +131,66 @@ def parse_json(text: str) -> JsonParseResult:
             parsed=None,
             error=error,
         )
+
+
+def parse_json_tree(text: str) -> Tuple[JsonParseResult, Optional[JsonValueTree]]:
+    """
+    Parse ``text`` in a single pass of the JSON grammar, returning the result
+    of ``parse_json`` together with the parse tree of the object.
+
+    Anything the grammar does not take is handed to ``parse_json``, so errors
+    keep the ``json`` module messages and positions. The tree is None unless
+    the text is a valid JSON object.
+    """
+    grammar_error: Optional[Exception] = None
+
+    # The grammar ignores form feeds as whitespace; JSON does not.
+    if "\f" not in text:
+        try:
+            tree = parse_json_grammar(text)
+        except (LarkError, ValueError) as e:
+            grammar_error = e
+        else:
+            return JsonParseResult(valid=True, parsed=tree.value, error=None), tree
+
+    result = parse_json(text)
+    if not result.valid or not isinstance(result.parsed, dict):
+        return result, None
+
+    # An object json.loads accepts but the grammar does not, e.g. one holding NaN.
+    if not isinstance(grammar_error, UnexpectedInput):
+        raise grammar_error
+    line = grammar_error.line
+    column = grammar_error.column
+    error = JsonParseError(
+        message=_GRAMMAR_ERROR_MESSAGE,
+        line=line,
+        column=column,
+        position=grammar_error.pos_in_stream,
+        context=_build_error_context(text, line, column)
+    )
+
+    return JsonParseResult(valid=False, parsed=None, error=error), None
+
+
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+_BRACKET_RE = re.compile(r'[\[\]{}]')
+
+
+def json_nesting_depth(text: str, limit: Optional[int] = None) -> int:
+    """
+    Return how deeply the objects and arrays of ``text`` nest, without
+    parsing it; brackets inside strings are skipped. With ``limit``, the scan
+    stops as soon as the depth exceeds it. Malformed text gives an estimate.
+    """
+    depth = max_depth = 0
+    for bracket in _BRACKET_RE.finditer(_STRING_RE.sub('""', text)):
+        if bracket.group() in "[{":
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+                if limit is not None and depth > limit:
+                    break
+        elif depth:
+            depth -= 1
+    return max_depth
@@ -1,72 +1,88 @@
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 from type_defs.json_types import JsonObject, JsonValue
 from type_defs.jwt_types import SymbolsTableEntry
 
 
 def build_symbol_table(data: JsonObject, prefix: str = "") -> List[SymbolsTableEntry]:
-    symbols: List[SymbolsTableEntry] = []
+    return list(iter_symbol_table(data, prefix))
 
-    if isinstance(data, dict):
-        for key, value in data.items():
-            path = f"{prefix}.{key}" if prefix else key
-            symbols.extend(_process_value(value, path))
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            path = f"{prefix}[{i}]"
-            symbols.extend(_process_value(item, path))
-    else:
+
+def iter_symbol_table(data: JsonObject, prefix: str = "") -> Iterator[SymbolsTableEntry]:
+    """
+    Yield the rows of ``build_symbol_table`` one by one, walking ``data`` in
+    pre-order with an explicit stack, so nesting depth is not bounded by the
+    recursion limit. Each path is built once, from its parent's path.
+    """
+    if not isinstance(data, (dict, list)):
         if prefix:
-            symbols.extend(_process_value(data, prefix))
+            entry = _symbol(prefix, data)
+            if entry is not None:
+                yield entry
+        return
+
+    stack = [_children(data, prefix)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
 
-    return symbols
+        path, value = child
+        entry = _symbol(path, value)
+        if entry is not None:
+            yield entry
+        if isinstance(value, (dict, list)):
+            stack.append(_children(value, path))
 
 
-def _process_value(value: JsonValue, path: str) -> List[SymbolsTableEntry]:
-    symbols: List[SymbolsTableEntry] = []
+def _children(container: JsonValue, path: str) -> Iterator[Tuple[str, JsonValue]]:
+    if isinstance(container, dict):
+        for key, value in container.items():
+            yield (f"{path}.{key}" if path else key), value
+    else:
+        for i, item in enumerate(container):
+            yield f"{path}[{i}]", item
+
 
+def _symbol(path: str, value: JsonValue) -> Optional[SymbolsTableEntry]:
     if value is None:
-        symbols.append({
+        return {
             "name": path,
             "type": "null",
             "value": "null",
-        })
+        }
     elif isinstance(value, bool):
-        symbols.append({
+        return {
             "name": path,
             "type": "boolean",
             "value": "true" if value else "false",
-        })
+        }
     elif isinstance(value, (int, float)):
-        symbols.append({
+        return {
             "name": path,
             "type": "number",
             "value": str(value),
-        })
+        }
     elif isinstance(value, str):
-        symbols.append({
+        return {
             "name": path,
             "type": "string",
             "value": value
-        })
+        }
     elif isinstance(value, dict):
-        symbols.append({
+        return {
             "name": path,
             "type": "object",
             "value": f"{{...}} ({len(value)} claves)",
-        })
-        symbols.extend(build_symbol_table(value, path))
+        }
     elif isinstance(value, list):
-        symbols.append({
+        return {
             "name": path,
             "type": "array",
             "value": f"[...] ({len(value)} elementos)",
-        })
-
-        for i, item in enumerate(value):
-            item_path = f"{path}[{i}]"
-            symbols.extend(_process_value(item, item_path))
+        }
 
-    return symbols
+    return None
 
-__all__ = ['build_symbol_table']
\ No newline at end of file
+__all__ = ['build_symbol_table', 'iter_symbol_table']
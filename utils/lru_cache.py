@@ -0,0 +1,111 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+__all__ = ['LRUCache']
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe least-recently-used cache bounded both by entry count and by
+    the total of the sizes given to ``put``. Values larger than ``max_bytes``
+    are not stored at all.
+
+    Entries put with ``expires_at`` (a ``time.time()`` timestamp) are dropped
+    once it passes: on lookup, and whenever a later ``put`` finds them due.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[V, int, Optional[float]]]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V, size: int, expires_at: Optional[float] = None) -> None:
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._purge_expired()
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            if expires_at is not None:
+                self._sequence += 1
+                heapq.heappush(self._expiry_heap, (expires_at, self._sequence, key))
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        heap = self._expiry_heap
+
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # The heap may still list a key that was replaced or evicted since.
+            if entry is not None and entry[2] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+        # Stale heap items of evicted keys would otherwise pile up.
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [item for item in heap if self._entries.get(item[2], (None, 0, None))[2] == item[0]]
+            heapq.heapify(self._expiry_heap)
@@ -0,0 +1,37 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+__all__ = ['get_process_pool', 'shutdown_process_pools']
+
+_pools: Dict[str, Tuple[ProcessPoolExecutor, int]] = {}
+_lock = threading.Lock()
+
+# Forking the threaded server can copy a lock another thread holds into the children, where it never gets released.
+_mp_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def get_process_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    """
+    Return the process pool registered as ``name``, creating it on first use.
+    Pools are per process: one inherited through fork (e.g. by gunicorn
+    workers) is not usable, so it is replaced.
+    """
+    with _lock:
+        pool, pid = _pools.get(name, (None, None))
+        if pool is None or pid != os.getpid():
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context)
+            _pools[name] = (pool, os.getpid())
+        return pool
+
+
+def shutdown_process_pools() -> None:
+    with _lock:
+        for pool, pid in _pools.values():
+            if pid == os.getpid():
+                pool.shutdown(wait=True)
+        _pools.clear()
@@ -1,7 +1,7 @@
 from http import HTTPStatus
-from typing import Optional, Union, List
+from typing import Iterable, Iterator, Optional, Union, List
 
-from flask import jsonify
+from flask import current_app, jsonify, Response
 
 from type_defs.http_types import HttpResponse
 from type_defs.json_types import JsonObject, ValidationErrors, JsonValue
@@ -33,3 +33,14 @@ def error_response(message: str = "Ha ocurrido un error.",
         response["details"] = errors
 
     return jsonify(response), status.value
+
+
+def ndjson_response(records: Iterable[JsonObject], status: HTTPStatus = HTTPStatus.OK) -> HttpResponse:
+    """Stream ``records`` as newline-delimited JSON, serializing each one only when the client reads it."""
+    json_provider = current_app.json
+
+    def generate() -> Iterator[str]:
+        for record in records:
+            yield json_provider.dumps(record) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson"), status.value
@@ -5,6 +5,7 @@ from typing import Type, Callable
 from flask import request
 from marshmallow import ValidationError, Schema
 
+from schemas.instances import get_schema
 from type_defs.json_types import JsonObject
 from utils.response_factory import error_response
 
@@ -22,8 +23,7 @@ def validate_req_body(schema_class: Type[Schema]):
                 )
 
             try:
-                schema = schema_class()
-                validated = schema.load(data)
+                validated = get_schema(schema_class).load(data)
             except ValidationError as e:
                 return error_response(
                     message="Error de validación en el cuerpo de la solicitud",